@@ -0,0 +1,42 @@
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime, timedelta
+import os, sys
+
+# Ensure backend app is importable
+sys.path.insert(0, os.path.abspath(os.path.join(__file__, "../../../apps/backend")))
+
+from app import create_app
+from app.utils.search_reconcile import reconcile_search_index
+
+default_args = {
+    'owner': 'airflow',
+    'depends_on_past': False,
+    'start_date': datetime(2024, 1, 1),
+    'retries': 2,
+    'retry_delay': timedelta(minutes=10),
+}
+
+with DAG(
+    dag_id='search_reconcile',
+    default_args=default_args,
+    description='Repair drift between Postgres jobs and the search index',
+    schedule_interval='0 5 * * *',  # daily at 5am, after the scrapers
+    catchup=False,
+) as dag:
+
+    def run_reconcile(range_size):
+        app = create_app()
+        with app.app_context():
+            result = reconcile_search_index(range_size)
+        print(
+            f"{len(result['differing'])} of {result['ranges']} ranges differed; "
+            f"re-indexed {result['reindexed']}, deleted {result['deleted']}"
+        )
+        return result['differing']
+
+    PythonOperator(
+        task_id='reconcile_search_index',
+        python_callable=run_reconcile,
+        op_args=[1000],
+    )
@@ -25,26 +25,20 @@ def create_app(config_class=DevelopmentConfig):
     es = init_es(app)
     app.extensions["es"] = es
     try:
-        if not es.indices.exists(index="jobs"):
-            es.indices.create(
-                index="jobs",
-                body={
-                    "mappings": {
-                        "properties": {
-                            "title": {"type": "text"},
-                            "company": {"type": "text"},
-                            "tags": {"type": "keyword"},
-                            "notes": {"type": "text"},
-                        }
-                    }
-                },
-            )
+        if app.config["SEARCH_BACKEND"] == "elasticsearch":
+            from .utils.es_client import ensure_jobs_index
+
+            ensure_jobs_index(es)
     except Exception as e:
         app.logger.warning(f"Skipping Elasticsearch index setup: {e}")
 
     # Initialize JWTManager with the Flask app
     jwt.init_app(app)
 
+    from .commands import register_commands
+
+    register_commands(app)
+
     from .routes.jobs import jobs_bp
 
     app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
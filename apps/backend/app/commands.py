@@ -0,0 +1,115 @@
+import time
+from datetime import datetime, timedelta
+import click
+from flask import Flask
+
+
+def register_commands(app: Flask) -> None:
+    """Attach maintenance commands to `flask <command>`."""
+
+    @app.cli.command("reconcile-status-counts")
+    def reconcile_status_counts_command():
+        """Rebuild the job status counters from the jobs table."""
+        from .utils.status_counts import reconcile_status_counts
+
+        rows = reconcile_status_counts()
+        click.echo(f"Rebuilt {rows} status counter rows")
+
+    @app.cli.command("purge-jobs")
+    @click.option("--months", type=int, required=True, help="Retention period.")
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--throttle", default=0.2, show_default=True, help="Seconds.")
+    @click.option("--dry-run", is_flag=True, help="Only count matching jobs.")
+    def purge_jobs_command(months, batch_size, throttle, dry_run):
+        """Delete jobs posted more than MONTHS ago, with their attachments."""
+        from .utils.retention import drain_attachment_deletes, purge_jobs_older_than
+
+        cutoff = datetime.utcnow() - timedelta(days=30 * months)
+        count = purge_jobs_older_than(cutoff, batch_size, throttle, dry_run)
+        if dry_run:
+            click.echo(f"{count} jobs posted before {cutoff:%Y-%m-%d} would be deleted")
+            return
+        click.echo(f"Deleted {count} jobs posted before {cutoff:%Y-%m-%d}")
+        click.echo(f"Removed {drain_attachment_deletes()} attachment objects")
+
+    @app.cli.command("drain-attachment-deletes")
+    def drain_attachment_deletes_command():
+        """Remove queued attachment objects of deleted jobs from MinIO."""
+        from .utils.retention import drain_attachment_deletes
+
+        click.echo(f"Removed {drain_attachment_deletes()} attachment objects")
+
+    @app.cli.command("search-outbox-worker")
+    @click.option("--batch-size", default=1000, show_default=True)
+    @click.option("--idle-seconds", default=1.0, show_default=True)
+    def search_outbox_worker_command(batch_size, idle_seconds):
+        """Continuously apply queued job changes to the search index."""
+        from .utils.search_outbox import run_search_outbox_worker
+
+        click.echo("Search outbox worker started")
+        run_search_outbox_worker(batch_size, idle_seconds)
+
+    @app.cli.command("reindex-jobs")
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--workers", default=4, show_default=True)
+    @click.option("--keep-old", is_flag=True, help="Keep the replaced index.")
+    def reindex_jobs_command(batch_size, workers, keep_old):
+        """Rebuild the jobs search index and swap the `jobs` alias to it."""
+        from .utils.reindex import reindex_jobs
+
+        def progress(done, seconds):
+            click.echo(f"  {done} documents, {done / seconds:.0f} docs/s")
+
+        result = reindex_jobs(batch_size, workers, keep_old, progress)
+        click.echo(
+            f"Indexed {result['indexed']} jobs into {result['index']} "
+            f"({result['superseded']} already newer, {result['deleted']} deleted "
+            f"during the load) in {result['seconds']:.1f}s, "
+            f"{result['docsPerSecond']:.0f} docs/s"
+        )
+        if result["replaced"]:
+            verb = "Kept" if keep_old else "Deleted"
+            click.echo(f"{verb} previous index {', '.join(result['replaced'])}")
+
+    @app.cli.command("reconcile-search")
+    @click.option("--range-size", default=1000, show_default=True)
+    @click.option("--dry-run", is_flag=True, help="Only report differing ranges.")
+    def reconcile_search_command(range_size, dry_run):
+        """Compare per-range checksums of Postgres and the search index and
+        re-sync the ranges that differ."""
+        from .utils.search_reconcile import reconcile_search_index
+
+        result = reconcile_search_index(range_size, dry_run)
+        for start, end in result["differing"]:
+            click.echo(f"  ids {start}-{end - 1} differ")
+        click.echo(
+            f"{len(result['differing'])} of {result['ranges']} ranges differ; "
+            f"re-indexed {result['reindexed']} jobs, deleted {result['deleted']}"
+        )
+
+    @app.cli.command("benchmark-search")
+    @click.argument("term")
+    @click.option("--runs", default=20, show_default=True)
+    @click.option("--per-page", default=20, show_default=True)
+    def benchmark_search_command(term, runs, per_page):
+        """Time TERM against every search backend and report latency."""
+        from .utils.es_client import SEARCH_BACKENDS, get_search_backend
+
+        for name in SEARCH_BACKENDS:
+            backend = get_search_backend(name)
+            timings = []
+            try:
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    _, _, total = backend.search(term, 1, per_page)
+                    timings.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                click.echo(f"{name}: failed ({e})")
+                continue
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            click.echo(
+                f"{name}: {total} hits, p50 {p50:.1f}ms, p95 {p95:.1f}ms "
+                f"over {runs} runs"
+            )
@@ -16,6 +16,8 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
     ELASTICSEARCH_URL = os.getenv("ELASTICSEARCH_URL", "http://elasticsearch:9200")
+    # "elasticsearch" or "postgres" (tsvector + pg_trgm, no ES required)
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "elasticsearch")
     MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
     MINIO_ROOT_USER = os.getenv("MINIO_ROOT_USER", "minioaccesskey")
     MINIO_ROOT_PASSWORD = os.getenv("MINIO_ROOT_PASSWORD", "miniosecretkey")
@@ -3,6 +3,7 @@ from sqlalchemy import (
     Table,
     Column,
     Integer,
+    BigInteger,
     String,
     Boolean,
     DateTime,
@@ -12,10 +13,12 @@ from sqlalchemy import (
     Text,
     Index,
     func,
+    false,
     Date,
     UniqueConstraint,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred, validates
 from .config import db
 from passlib.hash import bcrypt  # type: ignore
 from datetime import date
@@ -77,11 +80,17 @@ class Company(db.Model):
     )
 
 
+def normalize_tag_name(name: str) -> str:
+    """Case- and whitespace-insensitive tag key, e.g. "New Grad" -> "newgrad"."""
+    return "".join((name or "").lower().split())
+
+
 class Tag(db.Model):
     __tablename__ = "tags"
 
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True)
+    normalized_name = Column(String, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
     jobs = relationship(
@@ -90,7 +99,15 @@ class Tag(db.Model):
         back_populates="tags",
     )
 
-    __table_args__ = (Index("idx_tag_name", name),)
+    __table_args__ = (
+        Index("idx_tag_name", name),
+        Index("uq_tag_normalized_name", normalized_name, unique=True),
+    )
+
+    @validates("name")
+    def _set_normalized_name(self, key, name):
+        self.normalized_name = normalize_tag_name(name)
+        return name
 
 
 class Job(db.Model):
@@ -102,16 +119,24 @@ class Job(db.Model):
     )
     company = relationship("Company", backref="jobs")
     title = Column(String, nullable=False)
-    posted_date = Column(DateTime, server_default=func.now())
+    posted_date = Column(DateTime, nullable=False, server_default=func.now())
     link = Column(String, index=True)
     status = Column(Enum(Status), nullable=False, default=Status.nothing_done)
-    priority = Column(Boolean, default=False, index=True)
-    archived = Column(Boolean, default=False, index=True)
-    deleted = Column(Boolean, default=False, index=True)
+    priority = Column(
+        Boolean, nullable=False, default=False, server_default=false(), index=True
+    )
+    archived = Column(
+        Boolean, nullable=False, default=False, server_default=false(), index=True
+    )
+    deleted = Column(
+        Boolean, nullable=False, default=False, server_default=false(), index=True
+    )
     ats_score = Column(Float, default=0.0)
     notes = Column(Text)
     created_at = Column(DateTime, server_default=func.now(), index=True)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # title/company/tags/notes document, maintained by database triggers
+    search_vector = deferred(Column(TSVECTOR))
 
     tags = relationship(
         "Tag",
@@ -122,6 +147,26 @@ class Job(db.Model):
         "JobAttachment", back_populates="job", cascade="all, delete-orphan"
     )
 
+    # composite (sort column, id) indexes back keyset pagination in the tracker
+    __table_args__ = (
+        Index("idx_job_posted_date_id", posted_date, id),
+        Index("idx_job_status_id", status, id),
+        Index("idx_job_title_id", title, id),
+        Index("idx_job_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class JobStatusCount(db.Model):
+    """Job counts per status and filter flags, kept current by triggers on jobs."""
+
+    __tablename__ = "job_status_counts"
+
+    status = Column(Enum(Status), primary_key=True)
+    archived = Column(Boolean, primary_key=True)
+    priority = Column(Boolean, primary_key=True)
+    deleted = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
 
 class JobAttachment(db.Model):
     __tablename__ = "job_attachments"
@@ -142,6 +187,38 @@ class JobAttachment(db.Model):
     )
 
 
+class JobLinkCheck(db.Model):
+    """Result of the most recent dead-link check for a job."""
+
+    __tablename__ = "job_link_checks"
+
+    job_id = Column(
+        Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    checked_at = Column(DateTime, nullable=False)
+    # None when the request failed without a response
+    http_status = Column(Integer, nullable=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("idx_link_check_checked_at", checked_at),)
+
+
+class SearchOutbox(db.Model):
+    """Jobs whose search document must be refreshed.
+
+    Rows are written by triggers on `jobs` in the same transaction as the
+    change and drained by the search outbox worker.
+    """
+
+    __tablename__ = "search_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -7,7 +7,8 @@ from flask_jwt_extended import (
 )
 from ..config import db
 from ..models import User, Company
-from ..utils.minio_client import upload_fileobj
+from ..utils.minio_client import upload_fileobj, presign_get_url
+from ..utils.resolver import company_resolver
 import os
 import io
 
@@ -250,20 +251,8 @@ def onboard():
         )
         # parse comma-separated company names into whitelisted_companies
         if "preferredCompanies" in data:
-            names = [
-                n.strip()
-                for n in data.get("preferredCompanies", "").split(",")
-                if n.strip()
-            ]
-            companies = []
-            for name in names:
-                comp = Company.query.filter_by(name=name).first()
-                if not comp:
-                    comp = Company(name=name)
-                    db.session.add(comp)
-                    db.session.flush()
-                companies.append(comp)
-            user.whitelisted_companies = companies
+            names = data.get("preferredCompanies", "").split(",")
+            user.whitelisted_companies = company_resolver.load_many(names)
         # update user-specific blacklist/whitelist if provided
         if "blacklistedCompanies" in data:
             user.blacklisted_companies = Company.query.filter(
@@ -327,13 +316,7 @@ def upload_document():
         user.latex_url = object_key
     elif field == "profilePic":
         # generate a public URL for profile picture
-        from ..utils.minio_client import get_minio_client
-        from datetime import timedelta
-
-        client = get_minio_client()
-        image_url = client.presigned_get_object(
-            bucket, object_key, expires=timedelta(seconds=3600)
-        )
+        image_url = presign_get_url(bucket, object_key, cached=False)
         user.profile_pic_url = image_url
     db.session.commit()  # type: ignore
     # Return the URL for the client to display
@@ -6,8 +6,13 @@ from ..config import db
 import os
 from werkzeug.utils import secure_filename
 import uuid
-from ..utils.minio_client import upload_fileobj, get_minio_client
-from ..utils.redis_client import get_cache, set_cache, delete_cache
+from ..utils.minio_client import upload_fileobj, presign_get_url
+from ..utils.response_cache import (
+    bump_generations,
+    cached_response,
+    company_generation,
+    COMPANIES,
+)
 from io import BytesIO
 import json
 
@@ -45,13 +50,12 @@ def upload_company_logo(company_id):
                 bucket_name, object_name, BytesIO(data), len(data), file.content_type
             )
             # Create a presigned URL for client access
-            minio_client = get_minio_client()
-            image_url = minio_client.presigned_get_object(
-                bucket_name, object_name, expires=3600
-            )
+            image_url = presign_get_url(bucket_name, object_name, cached=False)
             # Update company record
             company.image_url = image_url
             db.session.commit()
+            # logos are shown on tracker and jobs rows
+            bump_generations(COMPANIES)
             return jsonify({"success": True, "image_url": image_url})
         except Exception as e:
             return jsonify({"success": False, "error": str(e)}), 500
@@ -60,11 +64,11 @@ def upload_company_logo(company_id):
 
 
 @companies_bp.route("/<int:company_id>", methods=["GET"])
+@cached_response(
+    "company",
+    depends_on=lambda company_id: (COMPANIES, company_generation(company_id)),
+)
 def get_company(company_id):
-    cache_key = f"company:{company_id}"
-    cached = get_cache(cache_key)
-    if cached:
-        return jsonify(cached)
     company = Company.query.get_or_404(company_id)
     data = {
         "success": True,
@@ -76,8 +80,6 @@ def get_company(company_id):
             "image_url": company.image_url,
         },
     }
-    # Cache for 5 minutes
-    set_cache(cache_key, data, 300)
     return jsonify(data)
 
 
@@ -88,7 +90,7 @@ def whitelist_company(company):
         return jsonify({"success": False, "error": "Company not found"}), 404
     comp.blacklisted = False
     db.session.commit()
-    delete_cache(f"company:{comp.id}")
+    bump_generations(company_generation(comp.id))
     return jsonify({"success": True})
 
 
@@ -99,7 +101,7 @@ def blacklist_company(company):
         return jsonify({"success": False, "error": "Company not found"}), 404
     comp.blacklisted = True
     db.session.commit()
-    delete_cache(f"company:{comp.id}")
+    bump_generations(company_generation(comp.id))
     return jsonify({"success": True})
 
 
@@ -112,5 +114,5 @@ def update_followers(company):
         return jsonify({"success": False, "error": "Company not found"}), 404
     comp.follower_count = followers
     db.session.commit()
-    delete_cache(f"company:{comp.id}")
+    bump_generations(company_generation(comp.id))
     return jsonify({"success": True})
@@ -1,19 +1,55 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import (
+    Blueprint,
+    request,
+    jsonify,
+    current_app,
+    send_file,
+    stream_with_context,
+)
 from app.config import db
 from app.models import Job, Company, Status, Tag
-from sqlalchemy import select, update, delete, and_
+from sqlalchemy import select, update, and_
 from datetime import datetime, timedelta  # Add missing imports
-import requests  # Add missing import for remove_dead_links
 import os
 import io
 from app.models import JobAttachment
-from app.utils.minio_client import get_minio_client, upload_fileobj
-from app.utils.redis_client import get_cache, set_cache
+from app.scraper.link_checker import link_check_manager
+from app.utils.retention import (
+    drain_attachment_deletes,
+    purge_jobs_older_than,
+    queue_attachment_deletes,
+)
+from app.utils.minio_client import (
+    SIGNED_RESPONSE_WINDOW,
+    get_minio_client,
+    upload_fileobj,
+    presign_get_url,
+)
+from app.utils.response_cache import (
+    cached_response,
+    bump_generations,
+    time_bucket,
+    JOBS,
+    TAGS,
+    COMPANIES,
+)
+from app.utils.export import csv_chunks, ndjson_chunks
+from app.utils.tracker_utils import (
+    JOB_LIST_FIELDS,
+    decode_cursor,
+    eager_job_options,
+    encode_cursor,
+    json_response,
+    pack_rows,
+    parse_fields,
+    serialize_jobs,
+)
 from app.utils.job_utils import (
     parse_posted_date,
     get_or_create_company,
     get_or_create_tags,
-    index_job_es,
+    bulk_create_jobs,
+    bulk_update_jobs,
 )
 from app.models import User
 from flask_jwt_extended import jwt_required, get_jwt_identity  # Assuming JWT for auth
@@ -22,38 +58,70 @@ import tempfile
 
 jobs_bp = Blueprint("jobs", __name__)
 
+JOBS_PAGE_SIZE = 100
+JOBS_PAGE_MAX = 1000
+BULK_MAX_JOBS = 5000
+
 
 @jobs_bp.route("", methods=["GET"])
+# `fields` may request signed attachment URLs, so ETags expire with them
+@cached_response(
+    "jobs",
+    depends_on=(JOBS, TAGS, COMPANIES),
+    vary=lambda: time_bucket(SIGNED_RESPONSE_WINDOW),
+)
 def get_jobs():
-    # Try fetching cached jobs list
-    cached = get_cache("jobs_list")
-    if cached:
-        return jsonify(cached)
+    """Return one page of jobs in id order.
 
-    jobs = Job.query.all()
-    jobs_list = [
+    `limit` caps the page (default JOBS_PAGE_SIZE, at most JOBS_PAGE_MAX) and
+    `cursor` continues after the last page; `nextCursor` is null at the end.
+    Each page is cached under its own key.
+    """
+    try:
+        fields = parse_fields(request.args.get("fields")) or JOB_LIST_FIELDS
+        limit = int(request.args.get("limit", JOBS_PAGE_SIZE))
+        cursor = request.args.get("cursor")
+        _, after_id = decode_cursor(cursor, "id", "asc") if cursor else (None, 0)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    limit = max(1, min(limit, JOBS_PAGE_MAX))
+
+    jobs = (
+        Job.query.options(*eager_job_options(fields))
+        .filter(Job.id > after_id)
+        .order_by(Job.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(jobs) > limit
+    jobs = jobs[:limit]
+    next_cursor = encode_cursor("id", "asc", None, jobs[-1].id) if has_more else None
+    return json_response(
         {
-            "id": job.id,
-            "company": job.company.name if job.company else None,
-            "title": job.title,
-            "link": job.link,
-            "posted_date": job.posted_date.isoformat(),
-            "status": job.status.value,
-            "priority": job.priority,
-            "archived": job.archived,
-            "atsScore": job.ats_score,
-            "notes": job.notes or "",
-            "tags": [t.name for t in job.tags],
-            "company_image_url": (
-                job.company.image_url if job.company and job.company.image_url else None
-            ),
+            "success": True,
+            "jobs": pack_rows(serialize_jobs(jobs, fields=fields)),
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
         }
-        for job in jobs
-    ]
-    data = {"success": True, "jobs": jobs_list}
-    # Cache the response for 60 seconds
-    set_cache("jobs_list", data, 60)
-    return jsonify(data)
+    )
+
+
+EXPORT_FORMATS = {
+    "ndjson": (ndjson_chunks, "application/x-ndjson"),
+    "csv": (csv_chunks, "text/csv"),
+}
+
+
+@jobs_bp.route("/export", methods=["GET"])
+def export_jobs():
+    """Stream every non-deleted job as NDJSON (default) or CSV."""
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"success": False, "error": "format must be ndjson or csv"}), 400
+    chunks, mimetype = EXPORT_FORMATS[fmt]
+    rv = current_app.response_class(stream_with_context(chunks()), mimetype=mimetype)
+    rv.headers["Content-Disposition"] = f"attachment; filename=jobs.{fmt}"
+    return rv
 
 
 @jobs_bp.route("", methods=["POST"])
@@ -61,7 +129,7 @@ def create_job():
     session = db.session()
     data = request.get_json().get("job", {})
     company_name = data.get("company", {}).get("name")
-    if not company_name:
+    if not (company_name or "").strip():
         return jsonify({"success": False, "error": "Company name is required"}), 400
     # use helper to load or create company
     company = get_or_create_company(company_name)
@@ -87,9 +155,8 @@ def create_job():
         job.tags = tags
         session.add(job)
         session.commit()
-
-        # index job in Elasticsearch
-        index_job_es(job)
+        # the search index is updated from the outbox written by this commit
+        bump_generations(JOBS, TAGS)
         return (
             jsonify(
                 {"success": True, "job": {"id": job.id, "company": job.company.name}}
@@ -101,11 +168,82 @@ def create_job():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@jobs_bp.route("/bulk", methods=["POST"])
+def bulk_create():
+    """Create up to BULK_MAX_JOBS jobs; the body is {"jobs": [job, ...]} with
+    the same job shape as create_job. Returns one result per item."""
+    items = (request.get_json(silent=True) or {}).get("jobs")
+    if not isinstance(items, list):
+        return jsonify({"success": False, "error": "jobs must be a list"}), 400
+    if len(items) > BULK_MAX_JOBS:
+        return (
+            jsonify(
+                {"success": False, "error": f"At most {BULK_MAX_JOBS} jobs per request"}
+            ),
+            400,
+        )
+    try:
+        results, new_ids = bulk_create_jobs(items)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+    if new_ids:
+        bump_generations(JOBS, TAGS)
+    return jsonify({"success": True, "created": len(new_ids), "results": results})
+
+
+@jobs_bp.route("/bulk-update", methods=["POST"])
+def bulk_update():
+    """Apply a list of operations to many jobs in one transaction.
+
+    Body: {"ids": [1, 2, ...], "ops": [{"op": "archive"}, ...]} (see
+    bulk_update_values for the operations). Returns the updated live rows and
+    the ids that are now soft-deleted.
+    """
+    data = request.get_json(silent=True) or {}
+    ids, ops = data.get("ids"), data.get("ops")
+    if (
+        not isinstance(ids, list)
+        or not isinstance(ops, list)
+        or not all(isinstance(i, int) for i in ids)
+    ):
+        return jsonify({"success": False, "error": "ids and ops must be lists"}), 400
+    if len(ids) > BULK_MAX_JOBS:
+        return (
+            jsonify(
+                {"success": False, "error": f"At most {BULK_MAX_JOBS} jobs per request"}
+            ),
+            400,
+        )
+    ids = sorted(set(ids))
+    try:
+        matched = bulk_update_jobs(ids, ops)
+    except (ValueError, TypeError) as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+    bump_generations(JOBS)
+
+    jobs = Job.query.options(*eager_job_options()).filter(Job.id.in_(ids)).all()
+    live = [j for j in jobs if not j.deleted]
+    removed = [j.id for j in jobs if j.deleted]
+    return jsonify(
+        {
+            "success": True,
+            "updated": matched,
+            "jobs": serialize_jobs(live),
+            "removedIds": removed,
+        }
+    )
+
+
 @jobs_bp.route("/<int:job_id>", methods=["PUT"])
 def update_job(job_id):
     data = request.get_json().get("job")
     job = Job.query.get_or_404(job_id)
-    if "company" in data and data["company"].get("name"):
+    if "company" in data and (data["company"].get("name") or "").strip():
         company_name = data["company"]["name"]
         job.company = get_or_create_company(company_name)
 
@@ -125,9 +263,7 @@ def update_job(job_id):
         tags = get_or_create_tags(data["tags"])
         job.tags = tags
     db.session.commit()
-
-    # re-index job in Elasticsearch
-    index_job_es(job)
+    bump_generations(JOBS, TAGS)
     return jsonify({"success": True, "job": {"id": job.id}})
 
 
@@ -137,6 +273,7 @@ def archive_job(job_id):
     job = Job.query.get_or_404(job_id)
     job.archived = True
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"success": True})
 
 
@@ -147,6 +284,7 @@ def unarchive_job(job_id):
     job = Job.query.get_or_404(job_id)
     job.archived = False
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"success": True})
 
 
@@ -156,6 +294,7 @@ def toggle_priority(job_id):
     job = Job.query.get_or_404(job_id)
     job.priority = not job.priority
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"success": True, "priority": job.priority})
 
 
@@ -165,10 +304,7 @@ def soft_delete_job(job_id):
     job = Job.query.get_or_404(job_id)
     job.deleted = True
     session.commit()
-
-    # Remove job from Elasticsearch index
-    es = current_app.extensions["es"]
-    es.delete(index="jobs", id=job.id, ignore=[404])
+    bump_generations(JOBS)
     return jsonify({"success": True})
 
 
@@ -194,36 +330,40 @@ def update_status_arrow(job_id):
     new_index = max(0, min(len(statuses) - 1, current_index + direction))
     job.status = Status(statuses[new_index])
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"success": True})
 
 
 @jobs_bp.route("/delete-older-than/<int:months>", methods=["DELETE"])
 def delete_older_than(months: int):
-    session = db.session()
+    """Permanently delete jobs posted more than `months` ago, in batches.
+    With ?dry_run=1 only the number of matching jobs is returned."""
     cutoff = datetime.utcnow() - timedelta(days=30 * months)
-    stmt = delete(Job).where(Job.posted_date < cutoff)
-    deleted = session.execute(stmt).rowcount
-    session.commit()
-    return jsonify({"deleted_count": deleted})
+    dry_run = request.args.get("dry_run") == "1"
+    deleted = purge_jobs_older_than(cutoff, dry_run=dry_run)
+    if not dry_run:
+        try:
+            drain_attachment_deletes()
+        except Exception as e:
+            current_app.logger.warning(f"Attachment cleanup deferred: {e}")
+    return jsonify({"deleted_count": deleted, "dry_run": dry_run})
 
 
 @jobs_bp.route("/remove-dead-links", methods=["POST"])
 def remove_dead_links():
-    session = db.session()
-    jobs = session.execute(select(Job.id, Job.link).where(Job.deleted.is_(False))).all()
-    dead_ids: list[int] = []
-    for jid, link in jobs:
-        try:
-            r = requests.head(link, timeout=4)
-            if r.status_code >= 400:
-                dead_ids.append(jid)
-        except Exception:
-            dead_ids.append(jid)
-
-    if dead_ids:
-        session.execute(update(Job).where(Job.id.in_(dead_ids)).values(deleted=True))
-        session.commit()
-    return jsonify({"removed_count": len(dead_ids)})
+    """Start a background dead-link sweep; poll /remove-dead-links/status."""
+    started = link_check_manager.start(current_app._get_current_object())
+    return jsonify({"success": True, "started": started}), 202
+
+
+@jobs_bp.route("/remove-dead-links/status", methods=["GET"])
+def remove_dead_links_status():
+    return jsonify(link_check_manager.get_status())
+
+
+@jobs_bp.route("/remove-dead-links/cancel", methods=["POST"])
+def cancel_remove_dead_links():
+    return jsonify({"success": link_check_manager.cancel()})
 
 
 @jobs_bp.route("/archive-rejected", methods=["POST"])
@@ -236,6 +376,7 @@ def archive_rejected():
     )
     count = session.execute(stmt).rowcount
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"archived_count": count})
 
 
@@ -256,6 +397,7 @@ def archive_applied_older(months: int):
     )
     count = session.execute(stmt).rowcount
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"archived_count": count})
 
 
@@ -271,6 +413,7 @@ def mark_oldest_as_priority():
     stmt = update(Job).where(Job.id.in_(sub)).values(priority=True)
     count = session.execute(stmt).rowcount
     session.commit()
+    bump_generations(JOBS)
     return jsonify({"marked_count": count})
 
 
@@ -280,19 +423,7 @@ def restore_job(job_id):
     job = Job.query.get_or_404(job_id)
     job.deleted = False
     session.commit()
-
-    # Re-index restored job in Elasticsearch
-    es = current_app.extensions["es"]
-    es.index(
-        index="jobs",
-        id=job.id,
-        body={
-            "title": job.title,
-            "company": job.company.name,
-            "tags": [t.name for t in job.tags],
-            "notes": job.notes or "",
-        },
-    )
+    bump_generations(JOBS)
     return jsonify({"success": True})
 
 
@@ -306,12 +437,11 @@ def permanent_delete_job(job_id):
     # Handle actual DELETE request
     session = db.session()
     job = Job.query.get_or_404(job_id)
+    object_keys = [att.object_key for att in job.attachments]
     session.delete(job)
     session.commit()
-
-    # Remove job from Elasticsearch index
-    es = current_app.extensions["es"]
-    es.delete(index="jobs", id=job_id, ignore=[404])
+    bump_generations(JOBS)
+    queue_attachment_deletes(object_keys)
     response = jsonify({"success": True})
     return response
 
@@ -344,6 +474,7 @@ def upload_attachment(job_id: int):
     )
     session.add(att)
     session.commit()
+    bump_generations(JOBS)
     return jsonify(
         {
             "success": True,
@@ -366,11 +497,8 @@ def get_attachment(job_id: int, attachment_type: str):
     )
     if not att:
         return jsonify({"success": False, "error": "Attachment not found"}), 404
-    minio_client = get_minio_client()
     bucket = os.getenv("MINIO_BUCKET", "job-attachments")
-    url = minio_client.presigned_get_object(
-        bucket, att.object_key, expires=timedelta(minutes=10)
-    )
+    url = presign_get_url(bucket, att.object_key, expires=timedelta(minutes=10))
     return jsonify({"success": True, "url": url, "filename": att.filename})
 
 
@@ -500,11 +628,12 @@ Sincerely,
             session.add(attachment)
 
         session.commit()
+        bump_generations(JOBS)
 
         # --- Get Presigned URL ---
         # Reuse existing logic from get_attachment if possible, or implement here
         try:
-            presigned_url = minio_client.presigned_get_object(
+            presigned_url = presign_get_url(
                 bucket_name,
                 object_key,
                 expires=timedelta(hours=1),  # URL valid for 1 hour
@@ -3,12 +3,18 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import date
 from ..config import db
 from ..models import DailyStat, StatType
+from ..utils.response_cache import bump_generations, cached_response, stats_generation
 
 stats_bp = Blueprint("stats", __name__)
 
 
 @stats_bp.route("", methods=["GET"])
 @jwt_required()
+@cached_response(
+    "stats",
+    depends_on=lambda: (stats_generation(int(get_jwt_identity())),),
+    vary=lambda: date.today().isoformat(),
+)
 def get_stats():
     user_id = int(get_jwt_identity())
     today = date.today()
@@ -43,4 +49,5 @@ def set_stat():
         )
         db.session.add(stat)
     db.session.commit()
+    bump_generations(stats_generation(user_id))
     return jsonify({"stat_type": stat_type, "value": value}), 200
@@ -1,16 +1,37 @@
 from flask import Blueprint, request, jsonify, current_app
-from sqlalchemy import func, or_, and_, select
+from sqlalchemy import func, select, exists, false, tuple_
 from datetime import datetime, timedelta
 from ..config import db
-from ..models import Job, Tag, Status, Company, JobAttachment
-from ..utils.es_client import search_jobs_fuzzy
-from ..utils.minio_client import get_minio_client
-import os
+from ..models import Job, Tag, Status, Company, job_tags_table, normalize_tag_name
+from ..utils.es_client import SearchFilters, search_facets
+from ..utils.facets import sql_facets
+from ..utils.search import hybrid_search
+from ..utils.minio_client import SIGNED_RESPONSE_WINDOW
+from ..utils.response_cache import (
+    cached_response,
+    time_bucket,
+    JOBS,
+    TAGS,
+    COMPANIES,
+)
+from ..utils.status_counts import read_status_counts
+from ..utils.suggest import get_prefix_index
+from ..utils.tracker_utils import (
+    decode_cursor,
+    eager_job_options,
+    encode_cursor,
+    json_response,
+    load_jobs,
+    parse_fields,
+    serialize_jobs,
+    tracker_response,
+)
 
 tracker_bp = Blueprint("tracker", __name__)
 
 
 @tracker_bp.route("/tags", methods=["GET"])
+@cached_response("tags", depends_on=(JOBS, TAGS))
 def get_tags():
     # Aggregate tag counts via a select statement to avoid Query API
     session = db.session()
@@ -24,6 +45,39 @@ def get_tags():
     return jsonify({"tags": tags})
 
 
+@tracker_bp.route("/suggest", methods=["GET"])
+def suggest():
+    """Search-as-you-type completions for job titles, companies and tags."""
+    prefix = request.args.get("q", "")
+    limit = max(1, min(int(request.args.get("limit", 8)), 20))
+    suggestions = get_prefix_index().complete(prefix, limit) if prefix else []
+    return jsonify({"success": True, "suggestions": suggestions})
+
+
+NOT_APPLIED_STATUSES = [Status.nothing_done, Status.applying]
+
+
+def filter_by_tags(q, keys):
+    """Keep jobs carrying every tag in `keys` (normalized names).
+
+    Keys are resolved to ids with one indexed lookup, then each becomes an
+    EXISTS semi-join on job_tags, so jobs are never duplicated by the filter.
+    """
+    tag_ids = db.session.execute(
+        select(Tag.id).where(Tag.normalized_name.in_(list(keys)))
+    ).scalars().all()
+    if len(tag_ids) < len(keys):
+        return q.filter(false())
+    for tag_id in tag_ids:
+        q = q.filter(
+            exists().where(
+                job_tags_table.c.job_id == Job.id,
+                job_tags_table.c.tag_id == tag_id,
+            )
+        )
+    return q
+
+
 def status_counts_query(base):
     base = base.order_by(None)
 
@@ -32,286 +86,106 @@ def status_counts_query(base):
 
 
 @tracker_bp.route("", methods=["GET"])
+# rows carry signed attachment URLs and filter_within_week depends on the
+# clock, so bodies and ETags last at most SIGNED_RESPONSE_WINDOW
+@cached_response(
+    "tracker",
+    depends_on=(JOBS, TAGS, COMPANIES),
+    vary=lambda: time_bucket(SIGNED_RESPONSE_WINDOW),
+)
 def get_tracker_data():
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     group_by = request.args.get("group_by_company") == "1"
     q = Job.query.filter(Job.deleted.is_(False))
 
-    if request.args.get("show_archived") != "1":
+    show_archived = request.args.get("show_archived") == "1"
+    priority_only = request.args.get("show_priority") == "1"
+    not_applied = request.args.get("filter_not_applied") == "1"
+    # filters the status counters can't answer fall back to a GROUP BY
+    counters_usable = True
+
+    if not show_archived:
         q = q.filter(Job.archived.is_(False))
-    if request.args.get("show_priority") == "1":
+    if priority_only:
         q = q.filter(Job.priority.is_(True))
-    if request.args.get("filter_not_applied") == "1":
-        q = q.filter(Job.status.in_([Status.nothing_done, Status.applying]))
+    if not_applied:
+        q = q.filter(Job.status.in_(NOT_APPLIED_STATUSES))
+    posted_since = None
     if request.args.get("filter_within_week") == "1":
-        q = q.filter(Job.posted_date >= datetime.utcnow() - timedelta(days=7))
+        posted_since = datetime.utcnow() - timedelta(days=7)
+        q = q.filter(Job.posted_date >= posted_since)
+        counters_usable = False
+    required_tags = set()
     if request.args.get("filter_intern") == "1":
-        q = q.join(Job.tags).filter(
-            func.replace(func.lower(Tag.name), " ", "") == "internship"
-        )
+        required_tags.add("internship")
     if request.args.get("filter_newgrad") == "1":
-        q = q.join(Job.tags).filter(
-            func.replace(func.lower(Tag.name), " ", "") == "newgrad"
-        )
-
+        required_tags.add("newgrad")
     tag = request.args.get("selected_tag")
     if tag:
-        q = q.join(Job.tags).filter(Tag.name == tag)
+        required_tags.add(normalize_tag_name(tag))
+    if required_tags:
+        q = filter_by_tags(q, required_tags)
+        counters_usable = False
+    # the same filters, for Elasticsearch to apply on the search branch
+    search_filters = SearchFilters(
+        include_archived=show_archived,
+        priority_only=priority_only,
+        statuses=NOT_APPLIED_STATUSES if not_applied else None,
+        posted_since=posted_since,
+        tag_keys=tuple(required_tags),
+    )
+
+    def filtered_status_counts(query):
+        if counters_usable:
+            return read_status_counts(
+                include_archived=show_archived,
+                priority_only=priority_only,
+                statuses=NOT_APPLIED_STATUSES if not_applied else None,
+            )
+        return status_counts_query(query)
 
     search = request.args.get("search")
+    extra = {}
+    if request.args.get("facets") == "1":
+        extra["facets"] = (
+            search_facets(q, search, search_filters) if search else sql_facets(q)
+        )
+
     if search:
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("per_page", 20))
-        job_list: list[dict] = []
-        ids, scores, fuzzy_total = (
-            search_jobs_fuzzy(search, page, per_page)
-            if len(search) >= 3
-            else ([], [], 0)
+        ids, scores, total_jobs = hybrid_search(
+            q, search, page, per_page, search_filters
         )
-        if ids:
-            jobs_from_es = Job.query.filter(
-                Job.id.in_(ids), Job.deleted.is_(False)
-            ).all()
-            id_to_job = {j.id: j for j in jobs_from_es}
-            for idx, job_id in enumerate(ids):
-                j = id_to_job.get(job_id)
-                if not j:
-                    continue
-                sess = db.session()
-                atts = sess.query(JobAttachment).filter_by(job_id=job_id).all()
-                bucket = os.getenv("MINIO_BUCKET", "job-attachments")
-                client = get_minio_client()
-                resume_att = next(
-                    (a for a in atts if a.attachment_type == "resume"), None
-                )
-                cover_att = next(
-                    (a for a in atts if a.attachment_type == "cover_letter"), None
-                )
-                resume_filename = resume_att.filename if resume_att else None
-                resume_url = (
-                    client.presigned_get_object(
-                        bucket, resume_att.object_key, expires=timedelta(seconds=3600)
-                    )
-                    if resume_att
-                    else None
-                )
-                coverLetter_filename = cover_att.filename if cover_att else None
-                coverLetter_url = (
-                    client.presigned_get_object(
-                        bucket, cover_att.object_key, expires=timedelta(seconds=3600)
-                    )
-                    if cover_att
-                    else None
-                )
-                job_list.append(
-                    {
-                        "id": j.id,
-                        "company": j.company.name,
-                        "title": j.title,
-                        "link": j.link,
-                        "posted_date": j.posted_date.isoformat(),
-                        "status": j.status.value,
-                        "priority": j.priority,
-                        "archived": j.archived,
-                        "atsScore": j.ats_score,
-                        "notes": j.notes or "",
-                        "tags": [t.name for t in j.tags],
-                        "company_image_url": (
-                            j.company.image_url
-                            if j.company and j.company.image_url
-                            else None
-                        ),
-                        "score": scores[idx],
-                        "resumeFilename": resume_filename,
-                        "resumeUrl": resume_url,
-                        "coverLetterFilename": coverLetter_filename,
-                        "coverLetterUrl": coverLetter_url,
-                    }
-                )
-        additional_total = 0
-        if len(search) >= 3:
-            substr_q = q.join(Job.company)
-            substr_q = substr_q.filter(
-                or_(
-                    func.lower(Job.title).contains(search.lower()),
-                    func.lower(Company.name).contains(search.lower()),
-                )
-            )
-            if ids:
-                substr_q = substr_q.filter(~Job.id.in_(ids))
-            additional_ids = [row[0] for row in substr_q.with_entities(Job.id).all()]
-            additional_total = len(additional_ids)
-            if additional_ids:
-                jobs_additional = Job.query.filter(
-                    Job.id.in_(additional_ids), Job.deleted.is_(False)
-                ).all()
-                for j in jobs_additional:
-                    sess2 = db.session()
-                    atts2 = sess2.query(JobAttachment).filter_by(job_id=j.id).all()
-                    resume_att2 = next(
-                        (a for a in atts2 if a.attachment_type == "resume"), None
-                    )
-                    cover_att2 = next(
-                        (a for a in atts2 if a.attachment_type == "cover_letter"), None
-                    )
-                    resume_filename2 = resume_att2.filename if resume_att2 else None
-                    resume_url2 = (
-                        client.presigned_get_object(
-                            bucket,
-                            resume_att2.object_key,
-                            expires=timedelta(seconds=3600),
-                        )
-                        if resume_att2
-                        else None
-                    )
-                    coverLetter_filename2 = cover_att2.filename if cover_att2 else None
-                    coverLetter_url2 = (
-                        client.presigned_get_object(
-                            bucket,
-                            cover_att2.object_key,
-                            expires=timedelta(seconds=3600),
-                        )
-                        if cover_att2
-                        else None
-                    )
-                    job_list.append(
-                        {
-                            "id": j.id,
-                            "company": j.company.name,
-                            "title": j.title,
-                            "link": j.link,
-                            "posted_date": j.posted_date.isoformat(),
-                            "status": j.status.value,
-                            "priority": j.priority,
-                            "archived": j.archived,
-                            "atsScore": j.ats_score,
-                            "notes": j.notes or "",
-                            "tags": [t.name for t in j.tags],
-                            "company_image_url": (
-                                j.company.image_url
-                                if j.company and j.company.image_url
-                                else None
-                            ),
-                            "score": None,
-                            "resumeFilename": resume_filename2,
-                            "resumeUrl": resume_url2,
-                            "coverLetterFilename": coverLetter_filename2,
-                            "coverLetterUrl": coverLetter_url2,
-                        }
-                    )
-        total_jobs = fuzzy_total + additional_total
-        status_counts = status_counts_query(Job.query.filter(Job.deleted.is_(False)))
-        return jsonify(
-            {
-                "success": True,
-                "trackerData": {
-                    "jobs": job_list,
-                    "pagination": {
-                        "currentPage": page,
-                        "itemsPerPage": per_page,
-                        "totalPages": (total_jobs + per_page - 1) // per_page,
-                        "totalJobs": total_jobs,
-                    },
-                    "statusCounts": status_counts,
-                    "scrapeInfo": {
-                        "scraping": False,
-                        "scrapeProgress": 0,
-                        "estimatedSeconds": 0,
-                    },
-                    "health": {"isHealthy": True},
+        job_list = serialize_jobs(load_jobs(ids, fields), scores=scores, fields=fields)
+        status_counts = read_status_counts()
+        return json_response(
+            tracker_response(
+                job_list,
+                {
+                    "currentPage": page,
+                    "itemsPerPage": per_page,
+                    "totalPages": (total_jobs + per_page - 1) // per_page,
+                    "totalJobs": total_jobs,
                 },
-            }
+                status_counts,
+                **extra,
+            )
         )
 
     if group_by:
-        page = int(request.args.get("page", 1))
-        distinct_ids_q = q.join(Company).with_entities(Company.id).distinct()
-        total_companies = distinct_ids_q.count()
-        paged_companies = (
-            q.join(Company)
-            .with_entities(Company.id, Company.name)
-            .distinct()
-            .order_by(Company.name)
-            .offset((page - 1) * 1)
-            .limit(1)
-            .all()
-        )
-        company_ids = [cid for cid, _ in paged_companies]
-        job_list = []
-        for cid in company_ids:
-            jobs_for_company = (
-                q.filter(Job.company_id == cid).order_by(Job.posted_date.desc()).all()
-            )
-            for j in jobs_for_company:
-                atts = db.session().query(JobAttachment).filter_by(job_id=j.id).all()
-                bucket = os.getenv("MINIO_BUCKET", "job-attachments")
-                client = get_minio_client()
-                resume_att = next(
-                    (a for a in atts if a.attachment_type == "resume"), None
-                )
-                cover_att = next(
-                    (a for a in atts if a.attachment_type == "cover_letter"), None
-                )
-                resume_filename = resume_att.filename if resume_att else None
-                resume_url = (
-                    client.presigned_get_object(
-                        bucket, resume_att.object_key, expires=timedelta(seconds=3600)
-                    )
-                    if resume_att
-                    else None
-                )
-                coverLetter_filename = cover_att.filename if cover_att else None
-                coverLetter_url = (
-                    client.presigned_get_object(
-                        bucket, cover_att.object_key, expires=timedelta(seconds=3600)
-                    )
-                    if cover_att
-                    else None
-                )
-                job_list.append(
-                    {
-                        "id": j.id,
-                        "company": j.company.name,
-                        "title": j.title,
-                        "link": j.link,
-                        "posted_date": j.posted_date.isoformat(),
-                        "status": j.status.value,
-                        "priority": j.priority,
-                        "archived": j.archived,
-                        "atsScore": j.ats_score,
-                        "notes": j.notes or "",
-                        "tags": [t.name for t in j.tags],
-                        "company_image_url": (
-                            j.company.image_url
-                            if j.company and j.company.image_url
-                            else None
-                        ),
-                        "resumeFilename": resume_filename,
-                        "resumeUrl": resume_url,
-                        "coverLetterFilename": coverLetter_filename,
-                        "coverLetterUrl": coverLetter_url,
-                    }
-                )
-        status_counts = status_counts_query(q)
-        return jsonify(
-            {
-                "success": True,
-                "trackerData": {
-                    "jobs": job_list,
-                    "pagination": {
-                        "currentPage": page,
-                        "itemsPerPage": len(job_list),
-                        "totalPages": total_companies,
-                        "totalJobs": total_companies,
-                    },
-                    "statusCounts": status_counts,
-                    "scrapeInfo": {
-                        "scraping": False,
-                        "scrapeProgress": 0,
-                        "estimatedSeconds": 0,
-                    },
-                    "health": {"isHealthy": True},
-                },
-            }
+        jobs_per_company = request.args.get("jobs_per_company")
+        return grouped_page(
+            q,
+            int(request.args.get("page", 1)),
+            int(request.args.get("companies_per_page", 1)),
+            int(jobs_per_company) if jobs_per_company else None,
+            filtered_status_counts(q),
+            fields,
+            **extra,
         )
     sort_by = request.args.get("sort_by", "date")
     sort_direction = request.args.get("sort_direction", "desc")
@@ -320,15 +194,33 @@ def get_tracker_data():
         "date": Job.posted_date,
         "company": Company.name,
         "status": Job.status,
-        "priority": Job.priority,
+        "priority": func.coalesce(Job.priority, False),
         "title": Job.title,
     }
+    if sort_by not in sort_columns:
+        sort_by = "date"
+    if sort_direction != "asc":
+        sort_direction = "desc"
 
-    sort_column = sort_columns.get(sort_by, Job.posted_date)
+    sort_column = sort_columns[sort_by]
 
     if sort_by == "company":
         q = q.join(Job.company, isouter=True)
 
+    per_page = int(request.args.get("per_page", 20))
+    if "cursor" in request.args:
+        return keyset_page(
+            q,
+            sort_by,
+            sort_direction,
+            sort_column,
+            request.args["cursor"],
+            per_page,
+            filtered_status_counts(q),
+            fields,
+            **extra,
+        )
+
     # Apply sorting
     if sort_direction == "asc":
         q = q.order_by(sort_column.asc())
@@ -339,76 +231,186 @@ def get_tracker_data():
         q = q.order_by(Job.posted_date.desc())
 
     page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 20))
     total_jobs = q.count()
-    jobs = q.offset((page - 1) * per_page).limit(per_page).all()
-
-    job_list = []
-    for j in jobs:
-        atts = db.session().query(JobAttachment).filter_by(job_id=j.id).all()
-        bucket = os.getenv("MINIO_BUCKET", "job-attachments")
-        client = get_minio_client()
-        resume_att = next((a for a in atts if a.attachment_type == "resume"), None)
-        cover_att = next((a for a in atts if a.attachment_type == "cover_letter"), None)
-        resume_filename = resume_att.filename if resume_att else None
-        resume_url = (
-            client.presigned_get_object(
-                bucket, resume_att.object_key, expires=timedelta(seconds=3600)
-            )
-            if resume_att
-            else None
-        )
-        coverLetter_filename = cover_att.filename if cover_att else None
-        coverLetter_url = (
-            client.presigned_get_object(
-                bucket, cover_att.object_key, expires=timedelta(seconds=3600)
-            )
-            if cover_att
-            else None
+    jobs = (
+        q.options(*eager_job_options(fields))
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+    job_list = serialize_jobs(jobs, fields=fields)
+
+    status_counts = filtered_status_counts(q)
+
+    return json_response(
+        tracker_response(
+            job_list,
+            {
+                "currentPage": page,
+                "itemsPerPage": per_page,
+                "totalPages": (total_jobs + per_page - 1) // per_page,
+                "totalJobs": total_jobs,
+            },
+            status_counts,
+            **extra,
         )
-        job_list.append(
+    )
+
+
+def keyset_page(
+    q,
+    sort_by,
+    sort_direction,
+    sort_column,
+    cursor,
+    per_page,
+    status_counts,
+    fields=None,
+    **extra,
+):
+    """Serve one page seeking past `cursor` on (sort column, Job.id) instead of
+    OFFSET, and without counting the full result set.
+
+    An empty cursor starts from the first page. The response carries
+    `nextCursor`, which is null once the last page has been returned.
+    """
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort_by, sort_direction)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        # a row comparison lets Postgres start an index range scan on
+        # (sort column, id) at the cursor instead of filtering from the top
+        key = tuple_(sort_column, Job.id)
+        if sort_direction == "asc":
+            q = q.filter(key > tuple_(last_value, last_id))
+        else:
+            q = q.filter(key < tuple_(last_value, last_id))
+
+    if sort_direction == "asc":
+        q = q.order_by(sort_column.asc(), Job.id.asc())
+    else:
+        q = q.order_by(sort_column.desc(), Job.id.desc())
+
+    rows = (
+        q.options(*eager_job_options(fields))
+        .add_columns(sort_column)
+        .limit(per_page + 1)
+        .all()
+    )
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = None
+    if has_more:
+        last_job, last_value = rows[-1]
+        next_cursor = encode_cursor(sort_by, sort_direction, last_value, last_job.id)
+
+    return json_response(
+        tracker_response(
+            serialize_jobs([job for job, _ in rows], fields=fields),
             {
-                "id": j.id,
-                "company": j.company.name,
-                "title": j.title,
-                "link": j.link,
-                "posted_date": j.posted_date.isoformat(),
-                "status": j.status.value,
-                "priority": j.priority,
-                "archived": j.archived,
-                "atsScore": j.ats_score,
-                "notes": j.notes or "",
-                "tags": [t.name for t in j.tags],
-                "company_image_url": (
-                    j.company.image_url if j.company and j.company.image_url else None
-                ),
-                "resumeFilename": resume_filename,
-                "resumeUrl": resume_url,
-                "coverLetterFilename": coverLetter_filename,
-                "coverLetterUrl": coverLetter_url,
-            }
+                "itemsPerPage": per_page,
+                "nextCursor": next_cursor,
+                "hasMore": has_more,
+            },
+            status_counts,
+            **extra,
+        )
+    )
+
+
+def grouped_page(
+    q, page, companies_per_page, jobs_per_company, status_counts, fields=None, **extra
+):
+    """Serve a page of companies with their jobs and per-company status rollups.
+
+    One grouped query returns the page's companies, their rollups and the
+    total company count (via a window over the groups); a second query loads
+    their jobs, optionally capped per company with row_number().
+    """
+    filtered = q.order_by(None).with_entities(Job.company_id, Job.status).subquery()
+    rollups = [
+        func.count().filter(filtered.c.status == s).label(s.value) for s in Status
+    ]
+    rows = db.session.execute(
+        select(
+            Company.id,
+            Company.name,
+            Company.image_url,
+            func.count().label("job_count"),
+            func.count().over().label("total_companies"),
+            *rollups,
         )
+        .join(filtered, filtered.c.company_id == Company.id)
+        .group_by(Company.id)
+        .order_by(Company.name, Company.id)
+        .offset((page - 1) * companies_per_page)
+        .limit(companies_per_page)
+    ).all()
 
-    status_counts = status_counts_query(q)
+    if rows:
+        total_companies = rows[0].total_companies
+    elif page > 1:
+        # past the last page the window has no rows to report the total on
+        total_companies = (
+            q.order_by(None).with_entities(Job.company_id).distinct().count()
+        )
+    else:
+        total_companies = 0
+
+    company_ids = [r.id for r in rows]
+    jobs: list[Job] = []
+    if company_ids:
+        jobs_q = q.options(*eager_job_options(fields)).filter(
+            Job.company_id.in_(company_ids)
+        )
+        if jobs_per_company:
+            ranked = (
+                q.order_by(None)
+                .filter(Job.company_id.in_(company_ids))
+                .with_entities(
+                    Job.id.label("job_id"),
+                    func.row_number()
+                    .over(
+                        partition_by=Job.company_id,
+                        order_by=(Job.posted_date.desc(), Job.id.desc()),
+                    )
+                    .label("rank"),
+                )
+                .subquery()
+            )
+            jobs_q = jobs_q.join(ranked, ranked.c.job_id == Job.id).filter(
+                ranked.c.rank <= jobs_per_company
+            )
+        jobs = jobs_q.order_by(Job.posted_date.desc(), Job.id.desc()).all()
+        position = {cid: i for i, cid in enumerate(company_ids)}
+        jobs.sort(key=lambda j: position[j.company_id])
 
-    return jsonify(
+    companies = [
         {
-            "success": True,
-            "trackerData": {
-                "jobs": job_list,
-                "pagination": {
-                    "currentPage": page,
-                    "itemsPerPage": per_page,
-                    "totalPages": (total_jobs + per_page - 1) // per_page,
-                    "totalJobs": total_jobs,
-                },
-                "statusCounts": status_counts,
-                "scrapeInfo": {
-                    "scraping": False,
-                    "scrapeProgress": 0,
-                    "estimatedSeconds": 0,
-                },
-                "health": {"isHealthy": True},
-            },
+            "id": r.id,
+            "name": r.name,
+            "company_image_url": r.image_url,
+            "jobCount": r.job_count,
+            "statusCounts": {s.value: getattr(r, s.value) for s in Status},
         }
+        for r in rows
+    ]
+    job_list = serialize_jobs(jobs, fields=fields)
+    return json_response(
+        tracker_response(
+            job_list,
+            {
+                "currentPage": page,
+                "itemsPerPage": len(job_list),
+                "companiesPerPage": companies_per_page,
+                "totalPages": (total_companies + companies_per_page - 1)
+                // companies_per_page,
+                "totalJobs": total_companies,
+                "totalCompanies": total_companies,
+            },
+            status_counts,
+            companies=companies,
+            **extra,
+        )
     )
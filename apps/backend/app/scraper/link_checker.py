@@ -0,0 +1,282 @@
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..models import Job, JobLinkCheck, db
+from ..utils.response_cache import bump_generations, JOBS
+
+# total concurrent checks, and the cap for any single host
+LINK_CHECK_WORKERS = 32
+PER_HOST_LIMIT = 4
+LINK_CHECK_TIMEOUT = 4
+# check results are saved, and dead jobs soft-deleted, in batches of this size
+RESULT_FLUSH_SIZE = 100
+# links verified more recently than this are skipped; failing links are
+# re-checked every sweep until they recover or reach the failure limit
+LINK_RECHECK_AFTER = timedelta(days=3)
+LINK_DEAD_AFTER_FAILURES = 3
+
+# http_status is None when no response was received
+LinkResult = namedtuple("LinkResult", "alive http_status etag last_modified")
+
+
+class LinkChecker:
+    """Checks links concurrently, reusing one pooled Session per worker thread
+    and holding a per-host semaphore so no site sees more than PER_HOST_LIMIT
+    requests at once."""
+
+    def __init__(self, workers: int = LINK_CHECK_WORKERS):
+        self.workers = workers
+        self._local = threading.local()
+        self._hosts: dict[str, threading.Semaphore] = defaultdict(
+            lambda: threading.Semaphore(PER_HOST_LIMIT)
+        )
+        self._hosts_lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=PER_HOST_LIMIT)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        with self._hosts_lock:
+            return self._hosts[urlsplit(url).netloc.lower()]
+
+    def check_link(
+        self, url: str, etag: str | None = None, last_modified: str | None = None
+    ) -> LinkResult:
+        """HEAD the link, retrying with GET for servers that reject HEAD.
+
+        The validators from the previous check are sent as If-None-Match /
+        If-Modified-Since, so an unchanged page answers 304 without a body.
+        """
+        if not url:
+            return LinkResult(False, None, None, None)
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        session = self._session()
+        with self._host_slot(url):
+            try:
+                r = session.head(
+                    url,
+                    headers=headers,
+                    timeout=LINK_CHECK_TIMEOUT,
+                    allow_redirects=True,
+                )
+                if r.status_code in (403, 405, 501):
+                    r = session.get(
+                        url,
+                        headers=headers,
+                        timeout=LINK_CHECK_TIMEOUT,
+                        allow_redirects=True,
+                        stream=True,
+                    )
+                    r.close()
+            except requests.RequestException:
+                return LinkResult(False, None, etag, last_modified)
+        if r.status_code == 304:
+            return LinkResult(True, 304, etag, last_modified)
+        return LinkResult(
+            r.status_code < 400,
+            r.status_code,
+            r.headers.get("ETag"),
+            r.headers.get("Last-Modified"),
+        )
+
+    def check(self, links, cancel_event: threading.Event):
+        """Yield (job id, LinkResult) as checks complete. `links` holds
+        (job id, url, etag, last_modified) tuples."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self.check_link, url, etag, last_modified): job_id
+                for job_id, url, etag, last_modified in links
+            }
+            for future in as_completed(futures):
+                if cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    return
+                yield futures[future], future.result()
+
+
+def links_due(now: datetime):
+    """Live jobs never checked, last checked before LINK_RECHECK_AFTER, or
+    currently failing, with their stored validators and failure count."""
+    return db.session.execute(
+        select(
+            Job.id,
+            Job.link,
+            JobLinkCheck.etag,
+            JobLinkCheck.last_modified,
+            JobLinkCheck.consecutive_failures,
+        )
+        .outerjoin(JobLinkCheck, JobLinkCheck.job_id == Job.id)
+        .where(
+            Job.deleted.is_(False),
+            or_(
+                JobLinkCheck.job_id.is_(None),
+                JobLinkCheck.checked_at < now - LINK_RECHECK_AFTER,
+                JobLinkCheck.consecutive_failures > 0,
+            ),
+        )
+    ).all()
+
+
+def save_link_checks(rows: list[dict]) -> None:
+    """Upsert a batch of check results in one statement; does not commit."""
+    stmt = pg_insert(JobLinkCheck).values(rows)
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[JobLinkCheck.job_id],
+            set_={
+                c: stmt.excluded[c]
+                for c in (
+                    "checked_at",
+                    "http_status",
+                    "etag",
+                    "last_modified",
+                    "consecutive_failures",
+                )
+            },
+        )
+    )
+
+
+class LinkCheckManager:
+    """Runs one dead-link sweep at a time in a background thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._running = False
+        self._checked = 0
+        self._total = 0
+        self._removed = 0
+        self._start_time = None
+        self._error = None
+        self._thread = None
+
+    def start(self, app) -> bool:
+        with self._lock:
+            if self._running:
+                return False
+            self._cancel_event.clear()
+            self._checked = self._total = self._removed = 0
+            self._start_time = time.time()
+            self._error = None
+            self._running = True
+            self._thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+            self._thread.start()
+            return True
+
+    def cancel(self) -> bool:
+        with self._lock:
+            if not self._running:
+                return False
+            self._cancel_event.set()
+            return True
+
+    def get_status(self) -> dict:
+        with self._lock:
+            elapsed = time.time() - self._start_time if self._start_time else 0
+            remaining = (
+                elapsed / self._checked * (self._total - self._checked)
+                if self._checked
+                else 0
+            )
+            return {
+                "running": self._running,
+                "checked": self._checked,
+                "total": self._total,
+                "removed": self._removed,
+                "progress": (
+                    int(self._checked / self._total * 100) if self._total else 0
+                ),
+                "estimatedSeconds": int(remaining),
+                "error": self._error,
+            }
+
+    def _run(self, app):
+        with app.app_context():
+            try:
+                due = links_due(datetime.utcnow())
+                db.session.rollback()
+                with self._lock:
+                    self._total = len(due)
+                failures = {row.id: row.consecutive_failures or 0 for row in due}
+                links = [(r.id, r.link, r.etag, r.last_modified) for r in due]
+                results: list[dict] = []
+                for job_id, result in LinkChecker().check(links, self._cancel_event):
+                    with self._lock:
+                        self._checked += 1
+                    results.append(
+                        {
+                            "job_id": job_id,
+                            "checked_at": datetime.utcnow(),
+                            "http_status": result.http_status,
+                            "etag": result.etag,
+                            "last_modified": result.last_modified,
+                            "consecutive_failures": (
+                                0 if result.alive else failures[job_id] + 1
+                            ),
+                        }
+                    )
+                    if len(results) >= RESULT_FLUSH_SIZE:
+                        self._flush(results)
+                        results = []
+                self._flush(results)
+            except Exception as e:
+                app.logger.exception("Dead link check failed")
+                with self._lock:
+                    self._error = str(e)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._running = False
+
+    def _flush(self, results: list[dict]) -> None:
+        """Save a batch of results, then remove jobs that reached the limit."""
+        if not results:
+            return
+        save_link_checks(results)
+        db.session.commit()
+        self._remove(
+            [
+                r["job_id"]
+                for r in results
+                if r["consecutive_failures"] >= LINK_DEAD_AFTER_FAILURES
+            ]
+        )
+
+    def _remove(self, job_ids: list[int]) -> None:
+        """Soft-delete a batch of dead jobs; the search outbox drops them."""
+        if not job_ids:
+            return
+        db.session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.deleted.is_(False))
+            .values(deleted=True)
+        )
+        db.session.commit()
+        bump_generations(JOBS)
+        with self._lock:
+            self._removed += len(job_ids)
+
+
+link_check_manager = LinkCheckManager()
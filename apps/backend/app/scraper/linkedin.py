@@ -8,38 +8,41 @@ from fake_useragent import UserAgent  # type: ignore
 import re
 
 from ..models import Company, Job, db
+from ..utils.response_cache import (
+    bump_generations,
+    company_generation,
+    JOBS,
+    COMPANIES,
+)
+from ..utils.resolver import company_resolver
 from .utils import MIN_FOLLOWERS, fetch_followers_from_profile, fetch_company_logo
 
 # This module scrapes job postings from LinkedIn's guest API.
 
 
 def get_or_create_company(name: str, url: str) -> Company | None:
-    """Retrieve a Company by name or create it, fetching follower count if needed."""
-    comp = Company.query.filter_by(name=name).first()
-    # skip blacklisted companies
-    if comp and comp.blacklisted:
+    """Resolve a Company by name (creating it if missing) and fill in its
+    follower count and logo when they are not known yet."""
+    comp = company_resolver.load(name)
+    # skip blank names and blacklisted companies
+    if comp is None or comp.blacklisted:
         return None
-    # existing company: update follower_count and logo if needed
-    if comp:
-        if not comp.follower_count:
-            comp.follower_count = fetch_followers_from_profile(url)
-        # fetch logo if missing
-        if not getattr(comp, "image_url", None) and url:
-            logo_url = fetch_company_logo(url)
-            if logo_url:
-                comp.image_url = logo_url
-        db.session.commit()  # type: ignore
-        return comp
-    # new company: fetch follower count and logo then save
-    followers = fetch_followers_from_profile(url)
-    comp = Company(name=name, follower_count=followers)
-    # fetch logo
-    if url:
+    followers_updated = not comp.follower_count
+    if followers_updated:
+        comp.follower_count = fetch_followers_from_profile(url)
+    # fetch logo if missing
+    logo_url = None
+    if not getattr(comp, "image_url", None) and url:
         logo_url = fetch_company_logo(url)
         if logo_url:
             comp.image_url = logo_url
-    db.session.add(comp)  # type: ignore
+    if not (followers_updated or logo_url):
+        return comp
     db.session.commit()  # type: ignore
+    if logo_url:
+        bump_generations(COMPANIES)
+    else:
+        bump_generations(company_generation(comp.id))
     return comp
 
 
@@ -116,6 +119,7 @@ def scrape_linkedin(manager, job_roles: list[str]):
             )
             db.session.add(job)  # type: ignore
             db.session.commit()  # type: ignore
+            bump_generations(JOBS)
             # colored log for added job
             print(
                 f"\033[92mAdded job: {job_title} at {comp_name} ({comp.follower_count} followers)\033[0m"
@@ -1,39 +1,485 @@
 # app/utils/es_client.py
-from elasticsearch import Elasticsearch
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from datetime import datetime
+from typing import Optional
+from elasticsearch import Elasticsearch, helpers
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import false, func, or_, select
+from app.config import db
+from app.models import Company, Job, Status, normalize_tag_name
+from app.utils.facets import FACET_SIZE, sql_facets
+from app.utils.redis_client import get_redis_client
 import os
+import re
+
+
+JOBS_INDEX_MAPPING = {
+    "properties": {
+        "title": {"type": "text"},
+        "company": {"type": "text", "fields": {"raw": {"type": "keyword"}}},
+        "tags": {"type": "keyword"},
+        "notes": {"type": "text"},
+        "status": {"type": "keyword"},
+        "posted_date": {"type": "date"},
+        # filter-only fields, matched with term/range clauses in bool.filter
+        "archived": {"type": "boolean"},
+        "deleted": {"type": "boolean"},
+        "priority": {"type": "boolean"},
+        "company_id": {"type": "integer"},
+        "tag_keys": {"type": "keyword"},
+    }
+}
+
+# Tracker filters for the search branch. Elasticsearch applies them as
+# bool.filter clauses; the Postgres backend relies on the filtered query.
+SearchFilters = namedtuple(
+    "SearchFilters",
+    "include_archived priority_only statuses posted_since tag_keys",
+    defaults=(True, False, None, None, ()),
+)
+
+
+JOBS_ALIAS = "jobs"
+# while `flask reindex-jobs` runs, the outbox also writes to the index named here
+REINDEX_TARGET_KEY = "search:reindex-target"
+# ...and records the ids it deletes, for the reindex to re-apply before the swap
+REINDEX_DELETED_KEY = "search:reindex-deleted"
+# the outbox stops mirroring into the new index if a reindex dies this long ago
+REINDEX_TARGET_TTL = 6 * 3600
 
 
 def get_es_client():
     return Elasticsearch([os.getenv("ELASTICSEARCH_URL", "http://elasticsearch:9200")])
 
 
+def new_jobs_index_name() -> str:
+    """A versioned concrete index name behind the `jobs` alias."""
+    return f"{JOBS_ALIAS}_{datetime.utcnow():%Y%m%d%H%M%S}"
+
+
+def create_jobs_index(es, name: str, settings: Optional[dict] = None) -> None:
+    body = {"mappings": JOBS_INDEX_MAPPING}
+    if settings:
+        body["settings"] = settings
+    es.indices.create(index=name, body=body)
+
+
+def ensure_jobs_index(es) -> None:
+    """Create a versioned jobs index behind the `jobs` alias, or add any fields
+    missing from the existing one.
+
+    Documents indexed before a field was added lack it until re-indexed
+    (`flask reindex-jobs`).
+    """
+    if not es.indices.exists(index=JOBS_ALIAS):
+        name = new_jobs_index_name()
+        create_jobs_index(es, name)
+        es.indices.put_alias(index=name, name=JOBS_ALIAS)
+    else:
+        es.indices.put_mapping(index=JOBS_ALIAS, body=JOBS_INDEX_MAPPING)
+
+
+def swap_jobs_alias(es, new_index: str) -> list[str]:
+    """Point the `jobs` alias at `new_index` in one atomic update and return
+    the indices it was taken from. A concrete index still named `jobs` (from
+    before the alias existed) is dropped in the same update."""
+    actions = []
+    old: list[str] = []
+    if es.indices.exists_alias(name=JOBS_ALIAS):
+        old = list(es.indices.get_alias(name=JOBS_ALIAS))
+        actions += [{"remove": {"index": i, "alias": JOBS_ALIAS}} for i in old]
+    elif es.indices.exists(index=JOBS_ALIAS):
+        actions.append({"remove_index": {"index": JOBS_ALIAS}})
+    actions.append({"add": {"index": new_index, "alias": JOBS_ALIAS}})
+    es.indices.update_aliases(body={"actions": actions})
+    return old
+
+
+def reindex_target() -> Optional[str]:
+    """The index a running reindex is filling, if any."""
+    try:
+        target = get_redis_client().get(REINDEX_TARGET_KEY)
+    except RedisError as e:
+        current_app.logger.warning(f"Could not read reindex target: {e}")
+        return None
+    return target.decode() if isinstance(target, bytes) else target
+
+
+def record_reindex_deletes(job_ids) -> None:
+    """Remember ids deleted while a reindex runs. A bulk create of a job read
+    before its deletion can land after the delete, so the reindex deletes
+    these again before swapping. Raises RedisError, leaving the outbox
+    entries queued, rather than losing a delete."""
+    pipe = get_redis_client().pipeline(transaction=False)
+    pipe.sadd(REINDEX_DELETED_KEY, *job_ids)
+    pipe.expire(REINDEX_DELETED_KEY, REINDEX_TARGET_TTL)
+    pipe.execute()
+
+
+def job_document(job) -> dict:
+    """The Elasticsearch source document for a job."""
+    return {
+        "title": job.title,
+        "company": job.company.name if job.company else None,
+        "tags": [t.name for t in job.tags],
+        "notes": job.notes or "",
+        "status": job.status.value if job.status else None,
+        "posted_date": job.posted_date.isoformat() if job.posted_date else None,
+        "archived": job.archived,
+        "deleted": job.deleted,
+        "priority": job.priority,
+        "company_id": job.company_id,
+        "tag_keys": [normalize_tag_name(t.name) for t in job.tags],
+    }
+
+
+def search_filter_clauses(filters: Optional[SearchFilters]) -> list[dict]:
+    """bool.filter clauses matching the tracker filters in `filters`."""
+    clauses: list[dict] = []
+    if filters is None:
+        return clauses
+    if not filters.include_archived:
+        # must_not, so documents indexed before the field existed still match
+        clauses.append({"bool": {"must_not": {"term": {"archived": True}}}})
+    if filters.priority_only:
+        clauses.append({"term": {"priority": True}})
+    if filters.statuses:
+        clauses.append({"terms": {"status": [s.value for s in filters.statuses]}})
+    if filters.posted_since:
+        clauses.append(
+            {"range": {"posted_date": {"gte": filters.posted_since.isoformat()}}}
+        )
+    clauses += [{"term": {"tag_keys": key}} for key in sorted(filters.tag_keys)]
+    return clauses
+
+
+def _search_query(search: str, filters: Optional[SearchFilters]) -> dict:
+    return {
+        "bool": {
+            "must": {
+                "multi_match": {
+                    "query": search,
+                    "fields": ["title^3", "company^2", "tags", "notes"],
+                    "fuzziness": "AUTO",
+                }
+            },
+            "filter": search_filter_clauses(filters),
+            # must_not, so documents indexed before the field existed still match
+            "must_not": {"term": {"deleted": True}},
+        }
+    }
+
+
+class SearchBackend(ABC):
+    """Full-text job search. Implementations return (job ids, scores, total)."""
+
+    name = ""
+
+    @abstractmethod
+    def search(
+        self,
+        search: str,
+        page: int,
+        per_page: int,
+        filters: Optional[SearchFilters] = None,
+    ) -> tuple[list[int], list[float], int]:
+        """One page of (job ids, scores, total hits) for `search`."""
+
+    @abstractmethod
+    def facets(self, q, search: str, filters: Optional[SearchFilters] = None) -> dict:
+        """Facet counts for the jobs in `q` matching `search`. `filters`
+        describes the filters on `q` for backends that cannot run it."""
+
+    @abstractmethod
+    def index_job(self, job) -> None:
+        """Make `job` searchable with its current title, company, tags and notes."""
+
+    def index_jobs(self, jobs) -> None:
+        """Index many jobs at once; the default indexes them one by one."""
+        for job in jobs:
+            self.index_job(job)
+
+    @abstractmethod
+    def delete_job(self, job_id: int) -> None:
+        """Remove a job from search results."""
+
+    def delete_jobs(self, job_ids) -> None:
+        """Remove many jobs at once; the default deletes them one by one."""
+        for job_id in job_ids:
+            self.delete_job(job_id)
+
+    def sync_jobs(self, jobs, deleted_ids) -> None:
+        """Index `jobs` and remove `deleted_ids` in as few requests as possible."""
+        self.index_jobs(jobs)
+        self.delete_jobs(deleted_ids)
+
+
+class ElasticsearchBackend(SearchBackend):
+    name = "elasticsearch"
+
+    def __init__(self, es=None):
+        self.es = es or current_app.extensions.get("es") or get_es_client()
+
+    def search(self, search, page, per_page, filters=None):
+        """Fuzzy multi_match over the jobs index, with `filters` applied in
+        filter context so they narrow the hits without affecting scores."""
+        body = {
+            "from": (page - 1) * per_page,
+            "size": per_page,
+            "query": _search_query(search, filters),
+            # only ids and scores are used
+            "_source": False,
+        }
+        res = self.es.search(index=JOBS_ALIAS, body=body)
+        # Extract total hits
+        total = (
+            res["hits"]["total"]["value"]
+            if isinstance(res["hits"]["total"], dict)
+            else res["hits"]["total"]
+        )
+        hits = res["hits"]["hits"]
+        ids = [int(hit["_id"]) for hit in hits]
+        scores = [hit.get("_score", 0.0) for hit in hits]
+        return ids, scores, total
+
+    def count_among(self, search, job_ids, filters=None) -> int:
+        """How many of `job_ids` match `search` and `filters`."""
+        query = _search_query(search, filters)
+        query["bool"]["filter"].append({"ids": {"values": [str(i) for i in job_ids]}})
+        return self.es.count(index=JOBS_ALIAS, body={"query": query})["count"]
+
+    def facets(self, q, search, filters=None):
+        """Status, tag, company and posted-week counts from one aggregation
+        request over the hits matching `search` and `filters`."""
+        body = {
+            "size": 0,
+            "query": _search_query(search, filters),
+            "aggs": {
+                "status": {"terms": {"field": "status", "size": len(Status)}},
+                "tags": {"terms": {"field": "tags", "size": FACET_SIZE}},
+                "companies": {"terms": {"field": "company.raw", "size": FACET_SIZE}},
+                "posted_weeks": {
+                    "date_histogram": {
+                        "field": "posted_date",
+                        "calendar_interval": "week",
+                        "min_doc_count": 1,
+                    }
+                },
+            },
+        }
+        aggs = self.es.search(index=JOBS_ALIAS, body=body)["aggregations"]
+
+        def buckets(name):
+            return aggs[name]["buckets"]
+
+        return {
+            "status": {b["key"]: b["doc_count"] for b in buckets("status")},
+            "tags": [
+                {"name": b["key"], "count": b["doc_count"]} for b in buckets("tags")
+            ],
+            "companies": [
+                {"name": b["key"], "count": b["doc_count"]}
+                for b in buckets("companies")
+            ],
+            "postedWeeks": [
+                {"week": b["key_as_string"][:10], "count": b["doc_count"]}
+                for b in buckets("posted_weeks")
+            ],
+        }
+
+    def index_job(self, job):
+        self.es.index(index=JOBS_ALIAS, id=job.id, body=job_document(job))
+
+    def index_jobs(self, jobs):
+        """Index `jobs` with one _bulk request per chunk."""
+        helpers.bulk(
+            self.es,
+            (
+                {"_index": JOBS_ALIAS, "_id": job.id, "_source": job_document(job)}
+                for job in jobs
+            ),
+        )
+
+    def delete_job(self, job_id):
+        self.es.delete(index=JOBS_ALIAS, id=job_id, ignore=[404])
+
+    def sync_jobs(self, jobs, deleted_ids):
+        """Send index and delete actions together through _bulk, also to the
+        index a running reindex is filling. Raises if any action fails, other
+        than deleting a document that is already gone."""
+        indices = [JOBS_ALIAS]
+        target = reindex_target()
+        if target:
+            indices.append(target)
+            if deleted_ids:
+                record_reindex_deletes(deleted_ids)
+        documents = [(job.id, job_document(job)) for job in jobs]
+        actions = [
+            {"_index": index, "_id": job_id, "_source": doc}
+            for index in indices
+            for job_id, doc in documents
+        ] + [
+            {"_op_type": "delete", "_index": index, "_id": job_id}
+            for index in indices
+            for job_id in deleted_ids
+        ]
+        _, errors = helpers.bulk(self.es, actions, raise_on_error=False)
+        failed = [e for e in errors if e.get("delete", {}).get("status") != 404]
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} search index actions failed, first: {failed[0]}"
+            )
+
+    def delete_jobs(self, job_ids):
+        """Delete with one _bulk request per chunk; missing documents are fine."""
+        helpers.bulk(
+            self.es,
+            (
+                {"_op_type": "delete", "_index": JOBS_ALIAS, "_id": job_id}
+                for job_id in job_ids
+            ),
+            raise_on_error=False,
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Search over the `jobs.search_vector` tsvector plus pg_trgm similarity.
+
+    The vector (title, company, tags, notes) is maintained by database
+    triggers, so indexing and deletion need no work here.
+    """
+
+    name = "postgres"
+
+    @staticmethod
+    def _match(search: str):
+        """Return (predicate, rank) for `search`, or None if it has no words."""
+        term = search.lower().strip()
+        tokens = re.findall(r"\w+", term)
+        if not tokens:
+            return None
+        tsquery = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in tokens))
+        title = func.lower(Job.title)
+        company = func.lower(Company.name)
+        predicate = or_(
+            Job.search_vector.op("@@")(tsquery),
+            title.op("%")(term),
+            company.op("%")(term),
+        )
+        rank = (
+            func.ts_rank_cd(Job.search_vector, tsquery)
+            + func.similarity(title, term)
+            + func.similarity(company, term)
+        )
+        return predicate, rank
+
+    def search(self, search, page, per_page, filters=None):
+        """Prefix full-text match, or trigram-similar title/company, ranked."""
+        match = self._match(search)
+        if match is None:
+            return [], [], 0
+        predicate, rank = match
+        stmt = (
+            select(Job.id, rank.label("score"), func.count().over().label("total"))
+            .join(Company, Company.id == Job.company_id)
+            .where(Job.deleted.is_(False), predicate)
+            .order_by(rank.desc(), Job.id.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        rows = db.session.execute(stmt).all()
+        if not rows:
+            return [], [], 0
+        return [r.id for r in rows], [float(r.score) for r in rows], rows[0].total
+
+    def facets(self, q, search, filters=None):
+        """Facet counts over the filtered query restricted to search matches."""
+        match = self._match(search)
+        if match is None:
+            return sql_facets(q.filter(false()))
+        return sql_facets(q.join(Job.company).filter(match[0]))
+
+    def index_job(self, job):
+        pass
+
+    def index_jobs(self, jobs):
+        pass
+
+    def delete_job(self, job_id):
+        pass
+
+    def delete_jobs(self, job_ids):
+        pass
+
+    def sync_jobs(self, jobs, deleted_ids):
+        pass
+
+
+SEARCH_BACKENDS = {
+    ElasticsearchBackend.name: ElasticsearchBackend,
+    PostgresSearchBackend.name: PostgresSearchBackend,
+}
+
+
+def get_search_backend(name: str | None = None) -> SearchBackend:
+    """Return the backend named by `name` or the SEARCH_BACKEND setting."""
+    name = name or current_app.config.get("SEARCH_BACKEND", "elasticsearch")
+    return SEARCH_BACKENDS[name]()
+
+
 def search_jobs_fuzzy(
-    search: str, page: int, per_page: int
+    search: str, page: int, per_page: int, filters: Optional[SearchFilters] = None
 ) -> tuple[list[int], list[float], int]:
     """
-    Perform a fuzzy multi_match search on the jobs index and return (
+    Perform a fuzzy search with the configured backend and return (
     list of job IDs, list of scores, total number of hits).
+
+    Elasticsearch applies `filters` itself; the Postgres backend ignores them
+    and leaves filtering to the caller. If Elasticsearch fails the query is
+    answered by the Postgres backend.
     """
-    es = get_es_client()
-    body = {
-        "from": (page - 1) * per_page,
-        "size": per_page,
-        "query": {
-            "multi_match": {
-                "query": search,
-                "fields": ["title^3", "company^2", "tags", "notes"],
-                "fuzziness": "AUTO",
-            }
-        },
-    }
-    res = es.search(index="jobs", body=body)
-    # Extract total hits
-    total = (
-        res["hits"]["total"]["value"]
-        if isinstance(res["hits"]["total"], dict)
-        else res["hits"]["total"]
-    )
-    hits = res["hits"]["hits"]
-    ids = [int(hit["_id"]) for hit in hits]
-    scores = [hit.get("_score", 0.0) for hit in hits]
-    return ids, scores, total
+    backend = get_search_backend()
+    try:
+        return backend.search(search, page, per_page, filters)
+    except Exception as e:
+        if backend.name == PostgresSearchBackend.name:
+            raise
+        current_app.logger.warning(
+            f"{backend.name} search failed, using postgres: {e}"
+        )
+        return PostgresSearchBackend().search(search, page, per_page)
+
+
+def count_fuzzy_matches_among(
+    search: str, job_ids: list[int], filters: Optional[SearchFilters] = None
+) -> Optional[int]:
+    """How many of `job_ids` Elasticsearch matches for `search` and `filters`,
+    in one _count request. None if the configured backend is not
+    Elasticsearch or the request fails."""
+    backend = get_search_backend()
+    if not isinstance(backend, ElasticsearchBackend):
+        return None
+    if not job_ids:
+        return 0
+    try:
+        return backend.count_among(search, job_ids, filters)
+    except Exception as e:
+        current_app.logger.warning(f"Search match count failed: {e}")
+        return None
+
+
+def search_facets(q, search: str, filters: Optional[SearchFilters] = None) -> dict:
+    """Facet counts for `search` from the configured backend, falling back to
+    Postgres if Elasticsearch fails."""
+    backend = get_search_backend()
+    try:
+        return backend.facets(q, search, filters)
+    except Exception as e:
+        if backend.name == PostgresSearchBackend.name:
+            raise
+        current_app.logger.warning(
+            f"{backend.name} facets failed, using postgres: {e}"
+        )
+        return PostgresSearchBackend().facets(q, search)
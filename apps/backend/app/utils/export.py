@@ -0,0 +1,100 @@
+import csv
+import io
+from typing import Iterator
+import orjson
+from sqlalchemy import select
+from app.config import db
+from app.models import Company, Job, Tag, job_tags_table
+from app.utils.tracker_utils import JOB_FIELDS, JOB_LIST_FIELDS
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = tuple(f for f in JOB_FIELDS if f in JOB_LIST_FIELDS)
+
+
+def iter_export_batches(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list[dict]]:
+    """Yield non-deleted jobs as lists of export rows, `batch_size` at a time.
+
+    Jobs are read through a server-side cursor as plain rows (no ORM identity
+    map), and each batch resolves its companies and tags with one query each,
+    so memory use depends on the batch size, not the table size.
+    """
+    result = db.session.execute(
+        select(
+            Job.id,
+            Job.company_id,
+            Job.title,
+            Job.link,
+            Job.posted_date,
+            Job.status,
+            Job.priority,
+            Job.archived,
+            Job.ats_score,
+            Job.notes,
+        )
+        .where(Job.deleted.is_(False))
+        .order_by(Job.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in result.partitions():
+        company_ids = {r.company_id for r in batch if r.company_id is not None}
+        companies = {
+            c.id: c
+            for c in db.session.execute(
+                select(Company.id, Company.name, Company.image_url).where(
+                    Company.id.in_(company_ids)
+                )
+            )
+        }
+        tags: dict[int, list[str]] = {}
+        for job_id, name in db.session.execute(
+            select(job_tags_table.c.job_id, Tag.name)
+            .join(Tag, Tag.id == job_tags_table.c.tag_id)
+            .where(job_tags_table.c.job_id.in_([r.id for r in batch]))
+            .order_by(job_tags_table.c.job_id, Tag.name)
+        ):
+            tags.setdefault(job_id, []).append(name)
+
+        rows = []
+        for r in batch:
+            company = companies.get(r.company_id)
+            rows.append(
+                {
+                    "id": r.id,
+                    "company": company.name if company else None,
+                    "title": r.title,
+                    "link": r.link,
+                    "posted_date": (
+                        r.posted_date.isoformat() if r.posted_date else None
+                    ),
+                    "status": r.status.value if r.status else None,
+                    "priority": r.priority,
+                    "archived": r.archived,
+                    "atsScore": r.ats_score,
+                    "notes": r.notes or "",
+                    "tags": tags.get(r.id, []),
+                    "company_image_url": company.image_url if company else None,
+                }
+            )
+        yield rows
+
+
+def ndjson_chunks(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """One JSON object per line, one chunk per batch."""
+    for rows in iter_export_batches(batch_size):
+        yield b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+
+def csv_chunks(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """CSV with a header row; tags are joined with "; "."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for rows in iter_export_batches(batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow(
+                "; ".join(row[c]) if c == "tags" else row[c] for c in EXPORT_COLUMNS
+            )
+        yield buffer.getvalue()
@@ -0,0 +1,68 @@
+from sqlalchemy import distinct, func, literal_column, select, tuple_
+from app.config import db
+from app.models import Company, Job, Tag, job_tags_table
+
+# buckets returned for the tag and company facets
+FACET_SIZE = 50
+
+# func.grouping(status, tag, company, week) bitmask for each grouping set;
+# a set bit means that column was aggregated away
+_GROUPING_STATUS = 0b0111
+_GROUPING_TAG = 0b1011
+_GROUPING_COMPANY = 0b1101
+_GROUPING_WEEK = 0b1110
+
+
+def sql_facets(q) -> dict:
+    """Status, tag, company and posted-week counts for the jobs in `q`.
+
+    All four facets come from one GROUPING SETS query; jobs are counted
+    distinctly so tag joins in `q` or in the facet itself don't inflate counts.
+    """
+    filtered = (
+        q.order_by(None)
+        .with_entities(Job.id, Job.status, Job.company_id, Job.posted_date)
+        .subquery()
+    )
+    week = func.date_trunc(literal_column("'week'"), filtered.c.posted_date)
+    stmt = (
+        select(
+            filtered.c.status,
+            Tag.name,
+            Company.name,
+            week,
+            func.count(distinct(filtered.c.id)),
+            func.grouping(filtered.c.status, Tag.name, Company.name, week),
+        )
+        .select_from(filtered)
+        .join(Company, Company.id == filtered.c.company_id)
+        .outerjoin(job_tags_table, job_tags_table.c.job_id == filtered.c.id)
+        .outerjoin(Tag, Tag.id == job_tags_table.c.tag_id)
+        .group_by(
+            func.grouping_sets(
+                tuple_(filtered.c.status),
+                tuple_(Tag.name),
+                tuple_(Company.name),
+                tuple_(week),
+            )
+        )
+    )
+    facets: dict = {"status": {}, "tags": [], "companies": [], "postedWeeks": []}
+    for status, tag, company, posted_week, count, grouping in db.session.execute(
+        stmt
+    ):
+        if grouping == _GROUPING_STATUS:
+            facets["status"][status.value] = count
+        elif grouping == _GROUPING_TAG and tag is not None:
+            facets["tags"].append({"name": tag, "count": count})
+        elif grouping == _GROUPING_COMPANY:
+            facets["companies"].append({"name": company, "count": count})
+        elif grouping == _GROUPING_WEEK and posted_week is not None:
+            facets["postedWeeks"].append(
+                {"week": posted_week.date().isoformat(), "count": count}
+            )
+    for key in ("tags", "companies"):
+        facets[key].sort(key=lambda f: (-f["count"], f["name"]))
+        del facets[key][FACET_SIZE:]
+    facets["postedWeeks"].sort(key=lambda f: f["week"])
+    return facets
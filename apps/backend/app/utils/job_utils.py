@@ -1,8 +1,19 @@
 from datetime import datetime
-from typing import List, Optional
-from flask import current_app
+from typing import Any, List, Optional
+from sqlalchemy import case, func, insert, literal, not_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.config import db
-from app.models import Company, Tag, Job, JobAttachment
+from app.models import (
+    Company,
+    Tag,
+    Job,
+    Status,
+    job_tags_table,
+    normalize_tag_name,
+)
+from app.utils.resolver import company_resolver, tag_resolver
+
+BULK_BATCH_SIZE = 500
 
 
 def parse_posted_date(date_str: Optional[str]) -> datetime:
@@ -19,40 +30,201 @@ def parse_posted_date(date_str: Optional[str]) -> datetime:
 
 
 def get_or_create_company(name: str) -> Company:
-    """Retrieve a Company by name or create it if missing."""
-    comp = Company.query.filter_by(name=name).first()
-    if not comp:
-        comp = Company(name=name)
-        db.session.add(comp)
-        db.session.commit()
-    return comp
+    """Retrieve a Company by name or create it if missing.
+
+    Raises ValueError if the name is blank.
+    """
+    if not (name or "").strip():
+        raise ValueError("Company name is required")
+    return company_resolver.load(name)
 
 
 def get_or_create_tags(names: List[str]) -> List[Tag]:
-    """Retrieve or create Tag records for the given names."""
-    created = False
-    for name in names:
-        if not Tag.query.filter_by(name=name).first():
-            db.session.add(Tag(name=name))
-            created = True
-    if created:
-        db.session.commit()
-    # return all tags matching
-    return Tag.query.filter(Tag.name.in_(names)).all()
-
-
-def index_job_es(job: Job) -> None:
-    """Index (or re-index) a job document in Elasticsearch."""
-    es = current_app.extensions.get("es")
-    if not es:
-        return
-    es.index(
-        index="jobs",
-        id=job.id,
-        body={
-            "title": job.title,
-            "company": job.company.name if job.company else None,
-            "tags": [t.name for t in job.tags],
-            "notes": job.notes or "",
+    """Retrieve or create Tag records for the given names.
+
+    Names that differ only in case or whitespace resolve to the same tag; the
+    first spelling seen is used when a tag has to be created.
+    """
+    return tag_resolver.load_many(names)
+
+
+def _bulk_job_fields(data: Any) -> dict:
+    """Validate one bulk item and return its column values; raise ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("Job must be an object")
+    company = data.get("company")
+    company_name = company.get("name") if isinstance(company, dict) else company
+    if not isinstance(company_name, str) or not company_name.strip():
+        raise ValueError("Company name is required")
+    title = data.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("Title is required")
+    for key in ("link", "posted_date", "notes"):
+        if not isinstance(data.get(key), (str, type(None))):
+            raise ValueError(f"{key} must be a string")
+    ats_score = data.get("ats_score", 0.0)
+    if ats_score is None:
+        ats_score = 0.0
+    if isinstance(ats_score, bool) or not isinstance(ats_score, (int, float)):
+        raise ValueError("ats_score must be a number")
+    tags = data.get("tags") or []
+    if not isinstance(tags, list):
+        raise ValueError("tags must be a list")
+    return {
+        "company": company_name.strip(),
+        "title": title,
+        "link": data.get("link") or None,
+        "posted_date": parse_posted_date(data.get("posted_date")),
+        "status": Status(data.get("status", "nothing_done")),
+        "priority": bool(data.get("priority", False)),
+        "archived": bool(data.get("archived", False)),
+        "deleted": False,
+        "ats_score": ats_score,
+        "notes": data.get("notes") or "",
+        "tags": [t for t in tags if isinstance(t, str)],
+    }
+
+
+def bulk_create_jobs(items: List[Any]) -> tuple[list[dict], list[int]]:
+    """Insert many jobs in one transaction and return (per-item results, new ids).
+
+    Companies and tags are resolved set-wise, jobs are inserted
+    BULK_BATCH_SIZE rows per statement, and an item whose link matches a live
+    job, or an earlier item in the same request, is skipped as a duplicate.
+    Each result is {"index", "status": created|duplicate|invalid, ...}.
+    """
+    results: list[Optional[dict]] = [None] * len(items)
+    valid: list[tuple[int, dict]] = []
+    for i, data in enumerate(items):
+        try:
+            valid.append((i, _bulk_job_fields(data)))
+        except (ValueError, TypeError) as e:
+            results[i] = {"index": i, "status": "invalid", "error": str(e)}
+
+    links = list({f["link"] for _, f in valid if f["link"]})
+    seen_links: dict[str, int] = {}
+    if links:
+        seen_links = dict(
+            db.session.execute(
+                select(Job.link, Job.id).where(
+                    Job.link.in_(links), Job.deleted.is_(False)
+                )
+            ).all()
+        )
+    first_index: dict[str, int] = {}
+    pending: list[tuple[int, dict]] = []
+    for i, fields in valid:
+        link = fields["link"]
+        if link in seen_links:
+            results[i] = {"index": i, "status": "duplicate", "id": seen_links[link]}
+        elif link in first_index:
+            results[i] = {
+                "index": i,
+                "status": "duplicate",
+                "duplicateOf": first_index[link],
+            }
+        else:
+            if link:
+                first_index[link] = i
+            pending.append((i, fields))
+
+    # ids go straight into INSERTs, so cached ones are verified first
+    company_ids = company_resolver.resolve_many(
+        [f["company"] for _, f in pending], verify=True
+    )
+    tag_ids = tag_resolver.resolve_many(
+        [t for _, f in pending for t in f["tags"]], verify=True
+    )
+
+    new_ids: list[int] = []
+    for start in range(0, len(pending), BULK_BATCH_SIZE):
+        batch = pending[start : start + BULK_BATCH_SIZE]
+        rows = [
+            {
+                k: v
+                for k, v in dict(f, company_id=company_ids[f["company"]]).items()
+                if k not in ("company", "tags")
+            }
+            for _, f in batch
+        ]
+        ids = db.session.execute(
+            insert(Job).returning(Job.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        job_tags = {
+            (job_id, tag_ids[key])
+            for job_id, (_, f) in zip(ids, batch)
+            for key in map(normalize_tag_name, f["tags"])
+            if key in tag_ids
+        }
+        if job_tags:
+            db.session.execute(
+                pg_insert(job_tags_table)
+                .values([{"job_id": j, "tag_id": t} for j, t in sorted(job_tags)])
+                .on_conflict_do_nothing()
+            )
+        for job_id, (i, _) in zip(ids, batch):
+            results[i] = {"index": i, "status": "created", "id": job_id}
+        new_ids.extend(ids)
+    db.session.commit()
+    return results, new_ids
+
+
+def status_arrow_expression(direction: int):
+    """CASE expression moving each row's status `direction` steps along the
+    pipeline, clamped at both ends."""
+    statuses = list(Status)
+    last = len(statuses) - 1
+    return case(
+        {
+            s: literal(statuses[max(0, min(last, i + direction))], Job.status.type)
+            for i, s in enumerate(statuses)
         },
+        value=Job.status,
+        else_=Job.status,
     )
+
+
+def bulk_update_values(op: Any) -> dict:
+    """Column assignments for one bulk operation; raise ValueError if invalid.
+
+    Supported ops: archive, unarchive, priority (with "value"),
+    toggle_priority, soft_delete, restore, status (with "status") and
+    status_arrow (with "direction").
+    """
+    if not isinstance(op, dict):
+        raise ValueError("Operation must be an object")
+    name = op.get("op")
+    if name == "archive":
+        return {"archived": True}
+    if name == "unarchive":
+        return {"archived": False}
+    if name == "priority":
+        return {"priority": bool(op.get("value", True))}
+    if name == "toggle_priority":
+        return {"priority": not_(func.coalesce(Job.priority, False))}
+    if name == "soft_delete":
+        return {"deleted": True}
+    if name == "restore":
+        return {"deleted": False}
+    if name == "status":
+        return {"status": Status(op.get("status"))}
+    if name == "status_arrow":
+        return {"status": status_arrow_expression(int(op.get("direction", 0)))}
+    raise ValueError(f"Unknown operation: {name}")
+
+
+def bulk_update_jobs(job_ids: List[int], ops: List[Any]) -> int:
+    """Apply `ops` in order to `job_ids` with one UPDATE per op, in a single
+    transaction. Returns how many of the ids exist. Raises ValueError (before
+    touching the database) if any op is invalid."""
+    assignments = [bulk_update_values(op) for op in ops]
+    matched = 0
+    for values in assignments:
+        matched = db.session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.session.commit()
+    return matched
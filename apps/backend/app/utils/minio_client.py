@@ -1,26 +1,129 @@
 # app/utils/minio_client.py
+from datetime import timedelta
+from typing import Iterable, Optional
+from flask import current_app
 from minio import Minio
+from minio.deleteobjects import DeleteObject
+from redis.exceptions import RedisError
 import os
+import threading
+
+# Presigned URLs are reused from Redis until this long before they expire
+PRESIGN_EXPIRES = timedelta(hours=1)
+PRESIGN_REFRESH_MARGIN = timedelta(minutes=30)
+# responses embedding signed URLs are cached and revalidated for at most this
+# long, well inside the margin, so a served URL stays usable for 25+ minutes
+SIGNED_RESPONSE_WINDOW = timedelta(minutes=5)
+
+_client: Optional[Minio] = None
+_client_lock = threading.Lock()
+_ready_buckets: set[str] = set()
 
 
 def get_minio_client():
-    endpoint = os.getenv("MINIO_DOMAIN", "minio:9000")
-    access_key = os.getenv("MINIO_ROOT_USER") or os.getenv("MINIO_ROOT_USER")
-    secret_key = os.getenv("MINIO_ROOT_PASSWORD") or os.getenv("MINIO_ROOT_PASSWORD")
-    client = Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=False)
-    bucket = os.getenv("MINIO_BUCKET", "job-attachments")
+    """Return the process-wide Minio client, creating it on first use.
+
+    The region is pinned so presigning is computed locally and never triggers
+    a bucket-location lookup.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                endpoint = os.getenv("MINIO_DOMAIN", "minio:9000")
+                access_key = os.getenv("MINIO_ROOT_USER")
+                secret_key = os.getenv("MINIO_ROOT_PASSWORD")
+                region = os.getenv("MINIO_REGION", "us-east-1")
+                _client = Minio(
+                    endpoint,
+                    access_key=access_key,
+                    secret_key=secret_key,
+                    secure=False,
+                    region=region,
+                )
+    ensure_bucket(_client, os.getenv("MINIO_BUCKET", "job-attachments"))
+    return _client
+
+
+def ensure_bucket(client: Minio, bucket: str) -> None:
+    """Create `bucket` if missing, checking at most once per process."""
+    if bucket in _ready_buckets:
+        return
     try:
         if not client.bucket_exists(bucket):
             client.make_bucket(bucket)
+        _ready_buckets.add(bucket)
     except Exception:
         pass
-    return client
+
+
+def _presign_cache_key(bucket: str, object_key: str, expires: timedelta) -> str:
+    return f"presign:{bucket}:{int(expires.total_seconds())}:{object_key}"
+
+
+def presign_get_urls(
+    bucket: str, object_keys: Iterable[str], expires: timedelta = PRESIGN_EXPIRES
+) -> dict[str, str]:
+    """Presign GET URLs for many objects, reusing cached URLs where still fresh.
+
+    Cached URLs are fetched with one MGET; the rest are signed in-process and
+    written back with one pipeline, so a batch never makes MinIO network calls.
+    """
+    keys = list(dict.fromkeys(k for k in object_keys if k))
+    if not keys:
+        return {}
+    redis = current_app.extensions.get("redis")
+    cache_keys = [_presign_cache_key(bucket, k, expires) for k in keys]
+    urls: dict[str, str] = {}
+    if redis is not None:
+        try:
+            for key, raw in zip(keys, redis.mget(cache_keys)):
+                if raw is not None:
+                    urls[key] = raw.decode() if isinstance(raw, bytes) else raw
+        except RedisError as e:
+            current_app.logger.warning(f"Presigned URL cache unavailable: {e}")
+            redis = None
+
+    missing = [k for k in keys if k not in urls]
+    if not missing:
+        return urls
+    client = get_minio_client()
+    for key in missing:
+        urls[key] = client.presigned_get_object(bucket, key, expires=expires)
+
+    ttl = int((expires - PRESIGN_REFRESH_MARGIN).total_seconds())
+    if redis is not None and ttl > 0:
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for key in missing:
+                pipe.setex(_presign_cache_key(bucket, key, expires), ttl, urls[key])
+            pipe.execute()
+        except RedisError as e:
+            current_app.logger.warning(f"Presigned URL cache unavailable: {e}")
+    return urls
+
+
+def presign_get_url(
+    bucket: str,
+    object_key: str,
+    expires: timedelta = PRESIGN_EXPIRES,
+    cached: bool = True,
+) -> str:
+    """Presign a single GET URL through the shared signer and cache.
+
+    Pass `cached=False` for URLs that are stored rather than served, so they
+    get their full lifetime instead of a cached URL's remainder.
+    """
+    if not cached:
+        return get_minio_client().presigned_get_object(
+            bucket, object_key, expires=expires
+        )
+    return presign_get_urls(bucket, [object_key], expires)[object_key]
 
 
 def upload_file(bucket: str, file_path: str, object_name: str):
     client = get_minio_client()
-    if not client.bucket_exists(bucket):
-        client.make_bucket(bucket)
+    ensure_bucket(client, bucket)
     client.fput_object(bucket, object_name, file_path)
     return object_name
 
@@ -29,7 +132,16 @@ def upload_fileobj(
     bucket: str, object_name: str, file_obj, length: int, content_type: str
 ):
     client = get_minio_client()
-    if not client.bucket_exists(bucket):
-        client.make_bucket(bucket)
+    ensure_bucket(client, bucket)
     client.put_object(bucket, object_name, file_obj, length, content_type=content_type)
     return object_name
+
+
+def remove_objects(bucket: str, object_keys: Iterable[str]) -> list[str]:
+    """Delete objects with multi-object delete requests; return keys that
+    could not be removed. Missing objects count as removed."""
+    errors = get_minio_client().remove_objects(
+        bucket, (DeleteObject(key) for key in object_keys)
+    )
+    # the request is only sent while the error iterator is consumed
+    return [e.name for e in errors if e.code != "NoSuchKey"]
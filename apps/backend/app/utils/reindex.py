@@ -0,0 +1,178 @@
+import time
+from typing import Callable, Iterator
+from elasticsearch import NotFoundError, helpers
+from flask import current_app
+from sqlalchemy import select
+from app.config import db
+from app.models import Job
+from app.utils.es_client import (
+    JOBS_ALIAS,
+    REINDEX_DELETED_KEY,
+    REINDEX_TARGET_KEY,
+    REINDEX_TARGET_TTL,
+    create_jobs_index,
+    get_es_client,
+    job_document,
+    new_jobs_index_name,
+    swap_jobs_alias,
+)
+from app.utils.redis_client import get_redis_client
+from app.utils.tracker_utils import load_jobs
+
+REINDEX_BATCH_SIZE = 500
+REINDEX_WORKERS = 4
+# settings for the bulk load; replicas and refresh are restored before the swap
+BULK_LOAD_SETTINGS = {"number_of_replicas": 0, "refresh_interval": "-1"}
+
+
+def _document_batches(index: str, batch_size: int) -> Iterator[list[dict]]:
+    """Yield create actions for every live job, `batch_size` at a time.
+
+    Ids stream through a server-side cursor; each batch is loaded with its
+    companies and tags batched and then dropped from the session.
+    """
+    ids = db.session.execute(
+        select(Job.id)
+        .where(Job.deleted.is_(False))
+        .order_by(Job.id)
+        .execution_options(yield_per=batch_size)
+    ).scalars()
+    for batch in ids.partitions():
+        yield [
+            # create: a newer copy written by the outbox meanwhile is kept
+            {
+                "_op_type": "create",
+                "_index": index,
+                "_id": job.id,
+                "_source": job_document(job),
+            }
+            for job in load_jobs(list(batch))
+        ]
+        db.session.expunge_all()
+
+
+def _live_index_settings(es) -> dict:
+    """Replica count and refresh interval of the index behind the alias, to
+    restore on the new index after the bulk load (None: cluster default)."""
+    try:
+        settings = es.indices.get_settings(
+            index=JOBS_ALIAS,
+            name="index.number_of_replicas,index.refresh_interval",
+            flat_settings=True,
+        )
+    except NotFoundError:
+        settings = {}
+    values = next(iter(settings.values()), {}).get("settings", {})
+    return {
+        "number_of_replicas": values.get("index.number_of_replicas"),
+        "refresh_interval": values.get("index.refresh_interval"),
+    }
+
+
+def _replay_deletes(es, index: str) -> int:
+    """Delete from `index` the jobs the outbox removed during the load that
+    are still deleted, in case their create arrived after the delete."""
+    ids = [int(i) for i in get_redis_client().smembers(REINDEX_DELETED_KEY)]
+    if not ids:
+        return 0
+    live = set(
+        db.session.execute(
+            select(Job.id).where(Job.id.in_(ids), Job.deleted.is_(False))
+        ).scalars()
+    )
+    db.session.rollback()
+    dead = [i for i in ids if i not in live]
+    helpers.bulk(
+        es,
+        ({"_op_type": "delete", "_index": index, "_id": i} for i in dead),
+        raise_on_error=False,
+    )
+    return len(dead)
+
+
+def reindex_jobs(
+    batch_size: int = REINDEX_BATCH_SIZE,
+    workers: int = REINDEX_WORKERS,
+    keep_old: bool = False,
+    progress: Callable[[int, float], None] | None = None,
+) -> dict:
+    """Rebuild the jobs index into a new versioned index and swap the alias.
+
+    Documents are built on this thread and sent by `workers` parallel bulk
+    requests of `batch_size`. While the load runs, the search outbox writes
+    every change to both the live index and the new one, so nothing committed
+    during the rebuild is lost at the swap; deletes it made are applied again
+    once the load is done, since a create can arrive after them. Aborts
+    without swapping if any document fails, and the new index is dropped
+    whenever the swap did not happen. Returns counts, timing and the old/new
+    index names.
+    """
+    es = current_app.extensions.get("es") or get_es_client()
+    redis = get_redis_client()
+    new_index = new_jobs_index_name()
+    restored_settings = _live_index_settings(es)
+    create_jobs_index(es, new_index, BULK_LOAD_SETTINGS)
+    redis.delete(REINDEX_DELETED_KEY)
+    redis.setex(REINDEX_TARGET_KEY, REINDEX_TARGET_TTL, new_index)
+
+    counts = {"indexed": 0, "superseded": 0}
+    failures: list[dict] = []
+    started = time.perf_counter()
+    old_indices: list[str] | None = None
+
+    def send(actions: list[dict]) -> None:
+        for ok, item in helpers.parallel_bulk(
+            es,
+            actions,
+            thread_count=workers,
+            chunk_size=batch_size,
+            raise_on_error=False,
+        ):
+            if ok:
+                counts["indexed"] += 1
+            elif item.get("create", {}).get("status") == 409:
+                counts["superseded"] += 1
+            else:
+                failures.append(item)
+
+    try:
+        # documents are built here and only the HTTP requests run in the
+        # bulk threads; `workers` requests stay in flight per window
+        window: list[dict] = []
+        for batch in _document_batches(new_index, batch_size):
+            window.extend(batch)
+            if len(window) >= batch_size * workers:
+                send(window)
+                window = []
+                if progress:
+                    progress(sum(counts.values()), time.perf_counter() - started)
+        send(window)
+        db.session.rollback()
+
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} documents failed, index not swapped: {failures[0]}"
+            )
+        replayed = _replay_deletes(es, new_index)
+        es.indices.put_settings(index=new_index, body={"index": restored_settings})
+        es.indices.refresh(index=new_index)
+        old_indices = swap_jobs_alias(es, new_index)
+    finally:
+        # stop the outbox mirroring before dropping an unswapped index
+        redis.delete(REINDEX_TARGET_KEY, REINDEX_DELETED_KEY)
+        if old_indices is None:
+            es.indices.delete(index=new_index, ignore=[404])
+
+    if not keep_old:
+        for index in old_indices:
+            es.indices.delete(index=index, ignore=[404])
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    return {
+        "index": new_index,
+        "replaced": old_indices,
+        **counts,
+        "deleted": replayed,
+        "seconds": elapsed,
+        "docsPerSecond": total / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,230 @@
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+import threading
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.config import db
+from app.models import Company, Tag, normalize_tag_name
+from app.utils.redis_client import get_redis_client
+
+RESOLVER_LRU_SIZE = 10_000
+# ids are stable, the TTL only bounds how long a removed row can be served
+RESOLVER_REDIS_TTL = 24 * 3600
+
+
+class _LRU:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, int]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        return found
+
+    def set_many(self, items: dict[str, int]) -> None:
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class NameResolver:
+    """Resolve names to row ids, creating missing rows race-free.
+
+    Lookups go through an in-process LRU, then Redis, then one
+    INSERT ... ON CONFLICT DO NOTHING RETURNING for everything still missing
+    plus one SELECT for rows another writer created first. Inserts run in
+    their own short transaction, so the caller's session is never committed
+    and concurrent creates of the same name cannot fail on the unique index.
+
+    Redis hits are checked against the table before use, since they outlive
+    processes and can name rows that were deleted or lost in a reset; `load`
+    and `load_many` also re-resolve when an LRU id no longer exists, and
+    `resolve_many(verify=True)` checks LRU hits as well.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        model,
+        key_column,
+        normalize: Callable[[str], str],
+        row_values: Callable[[str, str], dict],
+    ):
+        self.kind = kind
+        self.model = model
+        self.key_column = key_column
+        self.normalize = normalize
+        self.row_values = row_values
+        self._lru = _LRU(RESOLVER_LRU_SIZE)
+
+    def _redis_key(self, key: str) -> str:
+        return f"resolve:{self.kind}:{key}"
+
+    def _from_redis(self, keys: list[str]) -> dict[str, int]:
+        try:
+            raw = get_redis_client().mget([self._redis_key(k) for k in keys])
+        except RedisError as e:
+            current_app.logger.warning(f"Resolver cache unavailable: {e}")
+            return {}
+        return {k: int(v) for k, v in zip(keys, raw) if v is not None}
+
+    def _to_redis(self, items: dict[str, int]) -> None:
+        try:
+            pipe = get_redis_client().pipeline(transaction=False)
+            for key, row_id in items.items():
+                pipe.setex(self._redis_key(key), RESOLVER_REDIS_TTL, row_id)
+            pipe.execute()
+        except RedisError as e:
+            current_app.logger.warning(f"Resolver cache unavailable: {e}")
+
+    def _verified(self, cached: dict[str, int]) -> dict[str, int]:
+        """Keep the cached ids that still belong to their key; forget the rest."""
+        table = self.model.__table__
+        with db.engine.connect() as conn:
+            current = dict(
+                conn.execute(
+                    select(table.c.id, self.key_column).where(
+                        table.c.id.in_(list(cached.values()))
+                    )
+                ).all()
+            )
+        valid = {k: i for k, i in cached.items() if current.get(i) == k}
+        stale = [k for k in cached if k not in valid]
+        if stale:
+            self._forget_keys(stale)
+        return valid
+
+    def _from_database(self, spellings: dict[str, str]) -> dict[str, int]:
+        keys = sorted(spellings)
+        table = self.model.__table__
+        with db.engine.begin() as conn:
+            created = conn.execute(
+                pg_insert(table)
+                .values([self.row_values(k, spellings[k]) for k in keys])
+                .on_conflict_do_nothing()
+                .returning(self.key_column, table.c.id)
+            ).all()
+            found = dict(created)
+            existing = [k for k in keys if k not in found]
+            if existing:
+                found.update(
+                    conn.execute(
+                        select(self.key_column, table.c.id).where(
+                            self.key_column.in_(existing)
+                        )
+                    ).all()
+                )
+        return found
+
+    def resolve_many(
+        self, names: Iterable[str], verify: bool = False
+    ) -> dict[str, int]:
+        """Return {normalized key: id} for `names`, creating missing rows with
+        the first spelling seen. Blank names are ignored.
+
+        With `verify`, ids from the in-process LRU are checked against the
+        table too (one query), for callers that write them as foreign keys
+        without loading the rows.
+        """
+        spellings: dict[str, str] = {}
+        for name in names:
+            key = self.normalize(name or "")
+            if key:
+                spellings.setdefault(key, name.strip())
+        if not spellings:
+            return {}
+        ids = self._lru.get_many(spellings)
+        if verify and ids:
+            ids = self._verified(ids)
+        missing = [k for k in spellings if k not in ids]
+        if missing:
+            cached = self._from_redis(missing)
+            if cached:
+                cached = self._verified(cached)
+            ids.update(cached)
+            missing = [k for k in missing if k not in cached]
+            if missing:
+                created = self._from_database({k: spellings[k] for k in missing})
+                self._to_redis(created)
+                ids.update(created)
+            self._lru.set_many({k: ids[k] for k in spellings if k in ids})
+        return ids
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Id for a single name, or None if it is blank."""
+        key = self.normalize(name or "")
+        return self.resolve_many([name]).get(key) if key else None
+
+    def load(self, name: str):
+        """Resolve `name` and return its row from the session, or None if the
+        name is blank. An id cached for a row that is gone is forgotten and
+        the name resolved again."""
+        row_id = self.resolve(name)
+        if row_id is None:
+            return None
+        row = db.session.get(self.model, row_id)
+        if row is None:
+            self.forget([name])
+            row = db.session.get(self.model, self.resolve(name))
+        return row
+
+    def load_many(self, names: Iterable[str]) -> list:
+        """Rows for `names` (created if missing), like `load` for a list."""
+        names = list(names)
+        ids = self.resolve_many(names)
+        if not ids:
+            return []
+        rows = self.model.query.filter(self.model.id.in_(ids.values())).all()
+        if len(rows) < len(ids):
+            self.forget(names)
+            ids = self.resolve_many(names)
+            rows = self.model.query.filter(self.model.id.in_(ids.values())).all()
+        return rows
+
+    def forget(self, names: Iterable[str]) -> None:
+        """Drop cached ids, e.g. after rows are deleted or merged."""
+        self._forget_keys([self.normalize(n or "") for n in names])
+
+    def _forget_keys(self, keys: list[str]) -> None:
+        if not keys:
+            return
+        self._lru.discard(keys)
+        try:
+            get_redis_client().delete(*[self._redis_key(k) for k in keys])
+        except RedisError as e:
+            current_app.logger.warning(f"Resolver cache unavailable: {e}")
+
+
+company_resolver = NameResolver(
+    "company",
+    Company,
+    Company.__table__.c.name,
+    lambda name: name.strip(),
+    lambda key, name: {"name": key, "blacklisted": False, "follower_count": 0},
+)
+
+tag_resolver = NameResolver(
+    "tag",
+    Tag,
+    Tag.__table__.c.normalized_name,
+    normalize_tag_name,
+    lambda key, name: {"name": name, "normalized_name": key},
+)
@@ -0,0 +1,150 @@
+from datetime import timedelta
+from functools import wraps
+from typing import Callable, Iterable, Optional, Union
+import hashlib
+import json
+import time
+from flask import current_app, request
+from redis.exceptions import RedisError
+from .redis_client import get_redis_client
+
+# Generation counters: bump one after committing a write and every cached
+# response that depends on it is bypassed on the next read.
+JOBS = "jobs"
+TAGS = "tags"
+COMPANIES = "companies"
+
+
+def company_generation(company_id: int) -> str:
+    """Generation of a single company's detail record."""
+    return f"company:{company_id}"
+
+
+def stats_generation(user_id: int) -> str:
+    """Generation of one user's daily stats."""
+    return f"stats:{user_id}"
+
+
+def time_bucket(period: timedelta) -> str:
+    """Index of the current `period`-long window. Used as `vary` for views
+    whose bodies go stale with time alone, so their ETags expire too."""
+    return str(int(time.time() // period.total_seconds()))
+
+
+def _generation_key(name: str) -> str:
+    return f"gen:{name}"
+
+
+def get_generations(names: Iterable[str]) -> list[int]:
+    """Return the current value of each generation counter (0 if never bumped)."""
+    names = list(names)
+    raw = get_redis_client().mget([_generation_key(n) for n in names])
+    return [int(v) if v is not None else 0 for v in raw]
+
+
+def bump_generations(*names: str) -> None:
+    """Invalidate cached responses depending on `names`; call after commit."""
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for name in names:
+            pipe.incr(_generation_key(name))
+        pipe.execute()
+    except RedisError as e:
+        current_app.logger.warning(f"Failed to bump generations {names}: {e}")
+
+
+def normalized_args() -> str:
+    """Serialize the query string with keys and values sorted.
+
+    Empty values are kept: a parameter's presence alone can change the
+    response, e.g. `cursor=` selects the first keyset page.
+    """
+    return json.dumps(
+        {key: sorted(request.args.getlist(key)) for key in sorted(request.args)}
+    )
+
+
+def response_cache_key(
+    prefix: str, names: Iterable[str], generations: list[int], vary: str = ""
+) -> str:
+    digest = hashlib.sha1(
+        f"{request.path}?{normalized_args()}|{','.join(names)}|{vary}".encode()
+    ).hexdigest()
+    return f"resp:{prefix}:{'.'.join(map(str, generations))}:{digest}"
+
+
+def response_etag(key: str) -> str:
+    """Strong ETag for the response stored under `key`.
+
+    The key already encodes the path, arguments and generations, so equal
+    keys always describe an identical body.
+    """
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def not_modified(etag: str):
+    rv = current_app.response_class(status=304)
+    rv.set_etag(etag)
+    rv.headers["Cache-Control"] = "private, no-cache"
+    return rv
+
+
+def cached_response(
+    prefix: str,
+    depends_on: Union[Iterable[str], Callable[..., Iterable[str]]],
+    ttl: int = 300,
+    vary: Optional[Callable[[], str]] = None,
+):
+    """Cache a view's JSON body in Redis, keyed by its query args and the
+    generations of the data it reads, and answer conditional requests.
+
+    `depends_on` is a list of generation names, or a callable that takes the
+    view's keyword arguments and returns them (for per-record generations).
+    `vary` returns extra key material for inputs that no generation tracks,
+    such as the current date.
+
+    Responses carry an ETag derived from the cache key. A request whose
+    If-None-Match still matches gets a 304 after only the generation lookup.
+    Only 200 responses are stored. If Redis is unavailable the view runs
+    uncached and without an ETag.
+    """
+    static_names = None if callable(depends_on) else tuple(depends_on)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            names = (
+                static_names
+                if static_names is not None
+                else tuple(depends_on(**kwargs))
+            )
+            client = get_redis_client()
+            try:
+                key = response_cache_key(
+                    prefix, names, get_generations(names), vary() if vary else ""
+                )
+                etag = response_etag(key)
+                if request.if_none_match.contains(etag):
+                    return not_modified(etag)
+                raw = client.get(key)
+            except RedisError as e:
+                current_app.logger.warning(f"Response cache unavailable: {e}")
+                return view(*args, **kwargs)
+            if raw is not None:
+                current_app.logger.debug(f"Redis cache hit for key: {key}")
+                rv = current_app.response_class(raw, mimetype="application/json")
+            else:
+                rv = current_app.make_response(view(*args, **kwargs))
+                if rv.status_code != 200 or not rv.is_json:
+                    return rv
+                try:
+                    client.setex(key, ttl, rv.get_data())
+                except RedisError as e:
+                    current_app.logger.warning(f"Response cache unavailable: {e}")
+            rv.set_etag(etag)
+            rv.headers["Cache-Control"] = "private, no-cache"
+            return rv
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Iterable
+import json
+import os
+import time
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, select
+from app.config import db
+from app.models import Job, JobAttachment
+from app.utils.minio_client import remove_objects
+from app.utils.redis_client import get_redis_client
+from app.utils.response_cache import bump_generations, JOBS
+
+RETENTION_BATCH_SIZE = 500
+# pause between batches so replicas, autovacuum and live traffic keep up
+RETENTION_THROTTLE_SECONDS = 0.2
+# attachment objects of deleted jobs wait here until they are removed
+ATTACHMENT_DELETE_QUEUE = "retention:attachment-deletes"
+ATTACHMENT_DRAIN_BATCH = 1000
+
+
+def queue_attachment_deletes(object_keys: Iterable[str]) -> None:
+    """Queue attachment objects for removal from MinIO; call after commit."""
+    bucket = os.getenv("MINIO_BUCKET", "job-attachments")
+    entries = [json.dumps({"bucket": bucket, "key": key}) for key in object_keys]
+    if not entries:
+        return
+    try:
+        get_redis_client().rpush(ATTACHMENT_DELETE_QUEUE, *entries)
+    except RedisError as e:
+        current_app.logger.warning(f"Failed to queue {len(entries)} deletes: {e}")
+
+
+def drain_attachment_deletes(limit: int | None = None) -> int:
+    """Remove queued attachment objects, ATTACHMENT_DRAIN_BATCH per request.
+
+    Entries that MinIO fails to delete are re-queued. Returns how many objects
+    were removed.
+    """
+    client = get_redis_client()
+    removed = 0
+    while limit is None or removed < limit:
+        pipe = client.pipeline(transaction=True)
+        pipe.lrange(ATTACHMENT_DELETE_QUEUE, 0, ATTACHMENT_DRAIN_BATCH - 1)
+        pipe.ltrim(ATTACHMENT_DELETE_QUEUE, ATTACHMENT_DRAIN_BATCH, -1)
+        raw, _ = pipe.execute()
+        if not raw:
+            break
+        by_bucket: dict[str, list[str]] = {}
+        for entry in raw:
+            item = json.loads(entry)
+            by_bucket.setdefault(item["bucket"], []).append(item["key"])
+        for bucket, keys in by_bucket.items():
+            try:
+                failed = remove_objects(bucket, keys)
+            except Exception as e:
+                current_app.logger.warning(f"Attachment removal failed: {e}")
+                failed = keys
+            if failed:
+                client.rpush(
+                    ATTACHMENT_DELETE_QUEUE,
+                    *[json.dumps({"bucket": bucket, "key": k}) for k in failed],
+                )
+            removed += len(keys) - len(failed)
+            if failed and len(failed) == len(keys):
+                # MinIO is refusing everything; leave the rest for the next run
+                return removed
+    return removed
+
+
+def purge_jobs_older_than(
+    cutoff: datetime,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    throttle: float = RETENTION_THROTTLE_SECONDS,
+    dry_run: bool = False,
+) -> int:
+    """Permanently delete jobs posted before `cutoff` in short transactions.
+
+    Each batch locks up to `batch_size` jobs (skipping rows other writers
+    hold), collects their attachment keys, deletes them and commits; the
+    search outbox written by the delete removes them from the index, and
+    their attachment objects are queued for removal. With `dry_run` only the matching
+    jobs are counted. Returns the number of jobs deleted (or that would be).
+    """
+    if dry_run:
+        return db.session.execute(
+            select(func.count()).select_from(Job).where(Job.posted_date < cutoff)
+        ).scalar()
+
+    total = 0
+    while True:
+        ids = (
+            db.session.execute(
+                select(Job.id)
+                .where(Job.posted_date < cutoff)
+                .order_by(Job.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            db.session.rollback()
+            break
+        object_keys = (
+            db.session.execute(
+                select(JobAttachment.object_key).where(JobAttachment.job_id.in_(ids))
+            )
+            .scalars()
+            .all()
+        )
+        db.session.execute(
+            delete(Job)
+            .where(Job.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        total += len(ids)
+        bump_generations(JOBS)
+        queue_attachment_deletes(object_keys)
+        if len(ids) < batch_size:
+            break
+        if throttle:
+            time.sleep(throttle)
+    return total
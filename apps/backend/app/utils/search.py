@@ -0,0 +1,153 @@
+from typing import Optional
+from flask import current_app
+from sqlalchemy import distinct, func, or_
+from app.models import Company, Job
+from app.utils.es_client import (
+    SearchFilters,
+    count_fuzzy_matches_among,
+    search_jobs_fuzzy,
+)
+
+MIN_SEARCH_LENGTH = 3
+# deepest result position a search page may reach
+MAX_SEARCH_WINDOW = 1000
+
+
+def substring_matches(q, search: str):
+    """Restrict a filtered job query to title or company substring matches."""
+    term = search.lower()
+    return q.join(Job.company).filter(
+        or_(
+            func.lower(Job.title).contains(term),
+            func.lower(Company.name).contains(term),
+        )
+    )
+
+
+def _fuzzy_hits(q, search: str, window: int, filters: Optional[SearchFilters] = None):
+    """Collect up to `window` Elasticsearch hits that also pass the filters on `q`.
+
+    `filters` is pushed down to Elasticsearch, so its pages normally survive
+    the check against `q` intact; the check still drops hits from a lagging
+    index and does all the filtering when the Postgres backend answers.
+
+    Returns (kept ids in rank order, scores by id, every id ES returned, ES
+    total hit count). ES is read in window-sized chunks until enough hits
+    survive the filters, ES runs out, or MAX_SEARCH_WINDOW is reached.
+    """
+    kept: list[int] = []
+    scores: dict[int, Optional[float]] = {}
+    seen: list[int] = []
+    total = 0
+    es_page = 1
+    while len(kept) < window:
+        try:
+            ids, hit_scores, total = search_jobs_fuzzy(
+                search, es_page, window, filters
+            )
+        except Exception as e:
+            current_app.logger.warning(f"Fuzzy search unavailable: {e}")
+            break
+        if not ids:
+            break
+        seen.extend(ids)
+        allowed_rows = (
+            q.order_by(None).filter(Job.id.in_(ids)).with_entities(Job.id).all()
+        )
+        allowed = {row[0] for row in allowed_rows}
+        for job_id, score in zip(ids, hit_scores):
+            if job_id in allowed:
+                kept.append(job_id)
+                scores[job_id] = score
+        if len(seen) >= total or len(seen) >= MAX_SEARCH_WINDOW:
+            break
+        es_page += 1
+    return kept, scores, seen, max(total, len(seen))
+
+
+def _unread_total(
+    q, search: str, es_total: int, filters: Optional[SearchFilters]
+) -> Optional[int]:
+    """ES hits plus SQL substring hits that ES does not match, without reading
+    the ES hits past the page: the overlap comes from one ES _count over the
+    substring matches' ids (the first MAX_SEARCH_WINDOW of them). Needs the
+    filters pushed down to ES; returns None when they could not be."""
+    sql_q = substring_matches(q, search).order_by(None)
+    sql_total = sql_q.with_entities(func.count(distinct(Job.id))).scalar()
+    sql_ids = [
+        row[0]
+        for row in sql_q.with_entities(Job.id)
+        .distinct()
+        .limit(MAX_SEARCH_WINDOW)
+        .all()
+    ]
+    overlap = count_fuzzy_matches_among(search, sql_ids, filters)
+    if overlap is None:
+        return None
+    return es_total + sql_total - overlap
+
+
+def hybrid_search(
+    q,
+    search: str,
+    page: int,
+    per_page: int,
+    filters: Optional[SearchFilters] = None,
+) -> tuple[list[int], dict[int, Optional[float]], int]:
+    """Return one page of job ids matching `search`, ranked and deduplicated.
+
+    Elasticsearch fuzzy hits come first in score order, followed by SQL
+    substring hits that ES did not return, newest first. Both sides honour the
+    filters already applied to `q` (ES through `filters`, which must describe
+    them). Neither side is read past the requested page, so cost is bounded
+    by page depth rather than match count; the total does not depend on the
+    page.
+    Returns (ids, scores by id with None for SQL-only hits, total).
+    """
+    if len(search) < MIN_SEARCH_LENGTH:
+        return [], {}, 0
+    start = (page - 1) * per_page
+    window = min(page * per_page, MAX_SEARCH_WINDOW)
+
+    fuzzy_ids, scores, es_ids, es_total = _fuzzy_hits(q, search, window, filters)
+    if len(es_ids) < es_total < MAX_SEARCH_WINDOW:
+        # ES fills this page; the total still has to count the SQL-only hits
+        # so that it is the same whichever page is requested
+        total = _unread_total(q, search, es_total, filters)
+        if total is not None:
+            return fuzzy_ids[start:window], scores, total
+        # no filtered ES count available: read the rest of ES instead
+        fuzzy_ids, scores, es_ids, es_total = _fuzzy_hits(
+            q, search, es_total, filters
+        )
+    merged = list(fuzzy_ids)
+    if len(es_ids) >= es_total:
+        # SQL hits rank after every ES hit, so they are only needed once ES
+        # has nothing more to give
+        sql_q = substring_matches(q, search)
+        if es_ids:
+            sql_q = sql_q.filter(~Job.id.in_(es_ids))
+        sql_total = (
+            sql_q.order_by(None).with_entities(func.count(distinct(Job.id))).scalar()
+        )
+        remaining = window - len(merged)
+        if remaining > 0 and sql_total:
+            sql_ids = [
+                row[0]
+                for row in sql_q.order_by(None)
+                .with_entities(Job.id, Job.posted_date)
+                .distinct()
+                .order_by(Job.posted_date.desc(), Job.id.desc())
+                .limit(remaining)
+                .all()
+            ]
+            for job_id in sql_ids:
+                scores[job_id] = None
+            merged.extend(sql_ids)
+        total = len(fuzzy_ids) + sql_total
+    else:
+        # ES alone fills every reachable position, on any page
+        total = MAX_SEARCH_WINDOW
+
+    page_ids = merged[start:window] if start < window else []
+    return page_ids, scores, total
@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Optional
+from flask import current_app
+from sqlalchemy import delete, select
+from app.config import db
+from app.models import SearchOutbox
+from app.utils.es_client import get_search_backend
+from app.utils.response_cache import bump_generations, JOBS
+from app.utils.tracker_utils import load_jobs
+
+OUTBOX_BATCH_SIZE = 1000
+OUTBOX_IDLE_SECONDS = 1.0
+OUTBOX_MAX_BACKOFF_SECONDS = 30.0
+
+
+def drain_search_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Apply one batch of outbox entries to the search index.
+
+    Entries are claimed with FOR UPDATE SKIP LOCKED and coalesced per job.
+    Each job's current row decides the action: live jobs are re-indexed, and
+    deleted or missing ones are removed, so the last write always wins. The
+    batch goes out as one _bulk request and the entries are deleted in the
+    same transaction that claimed them. On failure they stay queued. Cached
+    responses are invalidated again once the index has caught up, since a
+    search run between the write and the drain cached pre-edit matches.
+    Returns the number of entries consumed.
+    """
+    rows = db.session.execute(
+        select(SearchOutbox.id, SearchOutbox.job_id)
+        .order_by(SearchOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+    job_ids = sorted({r.job_id for r in rows})
+    live = load_jobs(job_ids)
+    live_ids = {j.id for j in live}
+    try:
+        get_search_backend().sync_jobs(
+            live, [job_id for job_id in job_ids if job_id not in live_ids]
+        )
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.execute(
+        delete(SearchOutbox).where(SearchOutbox.id.in_([r.id for r in rows]))
+    )
+    db.session.commit()
+    bump_generations(JOBS)
+    return len(rows)
+
+
+def run_search_outbox_worker(
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    idle_seconds: float = OUTBOX_IDLE_SECONDS,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """Drain the outbox until `stop_event` is set, sleeping when it is empty
+    and backing off exponentially while the search backend is failing.
+
+    Run a single worker: SKIP LOCKED keeps extra workers from sharing
+    entries, but not from applying two updates of one job out of order.
+    """
+    backoff = idle_seconds
+    while stop_event is None or not stop_event.is_set():
+        try:
+            consumed = drain_search_outbox(batch_size)
+        except Exception as e:
+            current_app.logger.warning(f"Search outbox drain failed: {e}")
+            db.session.rollback()
+            backoff = min(backoff * 2, OUTBOX_MAX_BACKOFF_SECONDS)
+            time.sleep(backoff)
+            continue
+        backoff = idle_seconds
+        if consumed < batch_size:
+            time.sleep(idle_seconds)
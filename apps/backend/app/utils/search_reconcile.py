@@ -0,0 +1,140 @@
+import hashlib
+from elasticsearch import helpers
+from flask import current_app
+from sqlalchemy import select
+from app.config import db
+from app.models import Job
+from app.utils.es_client import JOBS_ALIAS, ElasticsearchBackend, get_es_client
+from app.utils.export import iter_export_batches
+from app.utils.tracker_utils import load_jobs
+
+RECONCILE_RANGE_SIZE = 1000
+RECONCILE_SYNC_BATCH = 500
+_MASK = (1 << 64) - 1
+# job_document fields compared between Postgres and the index
+HASHED_FIELDS = (
+    "title",
+    "company",
+    "tags",
+    "notes",
+    "status",
+    "posted_date",
+    "archived",
+    "priority",
+)
+
+
+def document_hash(doc: dict) -> int:
+    """64-bit hash of the indexed fields of `doc`, identical for an export row
+    and the Elasticsearch document built from the same job."""
+    parts = []
+    for f in HASHED_FIELDS:
+        value = doc.get(f)
+        if f == "tags":
+            parts.append("\x1e".join(sorted(value or [])))
+        else:
+            parts.append("" if value is None else str(value))
+    canonical = "\x1f".join(parts)
+    return int.from_bytes(
+        hashlib.blake2b(canonical.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def _add(checksums: dict, job_id: int, digest: int, range_size: int) -> None:
+    count, total = checksums.get(job_id // range_size, (0, 0))
+    checksums[job_id // range_size] = (count + 1, (total + digest) & _MASK)
+
+
+def postgres_checksums(range_size: int) -> dict[int, tuple[int, int]]:
+    """{range number: (live job count, sum of document hashes)}.
+
+    Deleted jobs are left out, matching the index, which drops them; the sum
+    is order-independent so ranges need no sorting on either side.
+    """
+    checksums: dict[int, tuple[int, int]] = {}
+    for rows in iter_export_batches():
+        for row in rows:
+            _add(checksums, row["id"], document_hash(row), range_size)
+    db.session.rollback()
+    return checksums
+
+
+def index_checksums(es, range_size: int) -> dict[int, tuple[int, int]]:
+    """The same per-range checksums over every document in the index."""
+    checksums: dict[int, tuple[int, int]] = {}
+    for hit in helpers.scan(
+        es,
+        index=JOBS_ALIAS,
+        query={"query": {"match_all": {}}},
+        _source=list(HASHED_FIELDS),
+        size=RECONCILE_SYNC_BATCH,
+    ):
+        _add(checksums, int(hit["_id"]), document_hash(hit["_source"]), range_size)
+    return checksums
+
+
+def _indexed_ids(es, start: int, end: int) -> list[int]:
+    # _id does not support range queries, so ask for every id in the range
+    return [
+        int(hit["_id"])
+        for hit in helpers.scan(
+            es,
+            index=JOBS_ALIAS,
+            query={"query": {"ids": {"values": [str(i) for i in range(start, end)]}}},
+            _source=False,
+        )
+    ]
+
+
+def repair_range(es, start: int, end: int) -> tuple[int, int]:
+    """Re-index every live job with start <= id < end and delete indexed ids
+    in that range that are deleted or missing in Postgres. Returns (indexed,
+    deleted)."""
+    live_ids = (
+        db.session.execute(
+            select(Job.id)
+            .where(Job.id >= start, Job.id < end, Job.deleted.is_(False))
+            .order_by(Job.id)
+        )
+        .scalars()
+        .all()
+    )
+    stale = sorted(set(_indexed_ids(es, start, end)) - set(live_ids))
+    backend = ElasticsearchBackend(es)
+    for i in range(0, len(live_ids), RECONCILE_SYNC_BATCH):
+        batch = live_ids[i : i + RECONCILE_SYNC_BATCH]
+        backend.sync_jobs(load_jobs(batch), [])
+        db.session.expunge_all()
+    if stale:
+        backend.sync_jobs([], stale)
+    db.session.rollback()
+    return len(live_ids), len(stale)
+
+
+def reconcile_search_index(
+    range_size: int = RECONCILE_RANGE_SIZE, dry_run: bool = False
+) -> dict:
+    """Compare Postgres and the search index range by range and repair only
+    the id ranges whose count or checksum differ.
+
+    Returns the number of ranges compared, the ranges that differed, and how
+    many documents were re-indexed or deleted (zero with `dry_run`).
+    """
+    es = current_app.extensions.get("es") or get_es_client()
+    pg = postgres_checksums(range_size)
+    indexed = index_checksums(es, range_size)
+    ranges = sorted(set(pg) | set(indexed))
+    differing = [r for r in ranges if pg.get(r) != indexed.get(r)]
+    result = {
+        "ranges": len(ranges),
+        "differing": [[r * range_size, (r + 1) * range_size] for r in differing],
+        "reindexed": 0,
+        "deleted": 0,
+    }
+    if dry_run:
+        return result
+    for r in differing:
+        reindexed, deleted = repair_range(es, r * range_size, (r + 1) * range_size)
+        result["reindexed"] += reindexed
+        result["deleted"] += deleted
+    return result
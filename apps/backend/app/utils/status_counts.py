@@ -0,0 +1,48 @@
+from typing import Iterable, Optional
+from sqlalchemy import delete, func, insert, select, text
+from app.config import db
+from app.models import Job, JobStatusCount, Status
+
+
+def read_status_counts(
+    include_archived: bool = True,
+    priority_only: bool = False,
+    statuses: Optional[Iterable[Status]] = None,
+) -> dict[str, int]:
+    """Sum the maintained counters for non-deleted jobs matching the flags.
+
+    This reads at most a few dozen counter rows, independent of table size.
+    """
+    stmt = (
+        select(JobStatusCount.status, func.sum(JobStatusCount.count))
+        .where(JobStatusCount.deleted.is_(False))
+        .group_by(JobStatusCount.status)
+    )
+    if not include_archived:
+        stmt = stmt.where(JobStatusCount.archived.is_(False))
+    if priority_only:
+        stmt = stmt.where(JobStatusCount.priority.is_(True))
+    if statuses is not None:
+        stmt = stmt.where(JobStatusCount.status.in_(list(statuses)))
+    rows = db.session.execute(stmt).all()
+    return {status.value: int(count) for status, count in rows if count}
+
+
+def reconcile_status_counts() -> int:
+    """Rebuild every counter from the jobs table and return the number of rows.
+
+    The counter table is locked for the rebuild so concurrent job writes wait
+    for it and then apply their deltas on top of the fresh totals.
+    """
+    session = db.session()
+    session.execute(text("LOCK TABLE job_status_counts IN EXCLUSIVE MODE"))
+    session.execute(delete(JobStatusCount))
+    keys = (Job.status, Job.archived, Job.priority, Job.deleted)
+    totals = select(*keys, func.count()).group_by(*keys)
+    result = session.execute(
+        insert(JobStatusCount).from_select(
+            ["status", "archived", "priority", "deleted", "count"], totals
+        )
+    )
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,212 @@
+from bisect import bisect_left
+from typing import Optional
+import heapq
+import threading
+import time
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from app.config import db
+from app.models import Company, Job, Tag, job_tags_table
+from app.utils.response_cache import get_generations, JOBS, TAGS, COMPANIES
+
+# Generations are checked at most this often; the index is rebuilt when they
+# have moved, or once it reaches the max age regardless.
+SUGGEST_MIN_REFRESH_SECONDS = 30
+SUGGEST_MAX_AGE_SECONDS = 600
+MAX_TERMS_PER_KIND = 50_000
+
+
+class PrefixIndex:
+    """Sorted-key prefix index over job titles, company names and tag names.
+
+    Every word start of a term is a key, so "eng" completes "Software
+    Engineer". A lookup bisects the sorted keys for the matching range, then
+    takes the top-k by job count from that range with a max segment tree, so
+    popular completions are found however many keys share the prefix.
+    """
+
+    def __init__(self, terms: list[tuple[str, str, int]]):
+        entries = []
+        for text, kind, weight in terms:
+            words = text.lower().split()
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), text, kind, weight))
+        entries.sort(key=lambda e: e[0])
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+        # _tree[p] is the position of the heaviest entry under node p; leaves
+        # start at len(entries)
+        n = len(entries)
+        weights = [e[3] for e in entries]
+        tree = [0] * n + list(range(n))
+        for p in range(n - 1, 0, -1):
+            a, b = tree[2 * p], tree[2 * p + 1]
+            tree[p] = a if weights[a] >= weights[b] else b
+        self._weights = weights
+        self._tree = tree
+
+    def _heaviest(self, lo: int, hi: int) -> int:
+        """Position of the heaviest entry in [lo, hi), which must be non-empty."""
+        weights, tree = self._weights, self._tree
+        best = -1
+        lo += len(weights)
+        hi += len(weights)
+        while lo < hi:
+            if lo & 1:
+                if best < 0 or weights[tree[lo]] > weights[best]:
+                    best = tree[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if best < 0 or weights[tree[hi]] > weights[best]:
+                    best = tree[hi]
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def _top(self, lo: int, hi: int, limit: int) -> list[tuple[str, str, int]]:
+        """The `limit` heaviest distinct terms in [lo, hi), heaviest first.
+
+        Sub-ranges wait in a heap keyed by their heaviest entry; popping one
+        emits that entry and splits the range around it.
+        """
+        ranked: list[tuple[str, str, int]] = []
+        seen: set[tuple[str, str]] = set()
+        heap = []
+        if lo < hi:
+            i = self._heaviest(lo, hi)
+            heap.append((-self._weights[i], i, lo, hi))
+        while heap and len(ranked) < limit:
+            _, i, lo, hi = heapq.heappop(heap)
+            _, text, kind, weight = self._entries[i]
+            if (kind, text) not in seen:
+                seen.add((kind, text))
+                ranked.append((text, kind, weight))
+            for a, b in ((lo, i), (i + 1, hi)):
+                if a < b:
+                    j = self._heaviest(a, b)
+                    heapq.heappush(heap, (-self._weights[j], j, a, b))
+        return ranked
+
+    def complete(self, prefix: str, limit: int = 8) -> list[dict]:
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        return [
+            {"text": text, "type": kind, "count": weight}
+            for text, kind, weight in self._top(lo, hi, limit)
+        ]
+
+
+def build_prefix_index() -> PrefixIndex:
+    """Load titles, companies and tags with their job counts (three queries)."""
+    live = Job.deleted.is_(False)
+    titles = db.session.execute(
+        select(Job.title, func.count())
+        .where(live)
+        .group_by(Job.title)
+        .order_by(func.count().desc())
+        .limit(MAX_TERMS_PER_KIND)
+    ).all()
+    companies = db.session.execute(
+        select(Company.name, func.count(Job.id))
+        .join(Job, Job.company_id == Company.id)
+        .where(live)
+        .group_by(Company.name)
+        .order_by(func.count(Job.id).desc())
+        .limit(MAX_TERMS_PER_KIND)
+    ).all()
+    tags = db.session.execute(
+        select(Tag.name, func.count(Job.id))
+        .join(job_tags_table, job_tags_table.c.tag_id == Tag.id)
+        .join(Job, Job.id == job_tags_table.c.job_id)
+        .where(live)
+        .group_by(Tag.name)
+        .order_by(func.count(Job.id).desc())
+        .limit(MAX_TERMS_PER_KIND)
+    ).all()
+    terms = (
+        [(name, "title", count) for name, count in titles if name]
+        + [(name, "company", count) for name, count in companies if name]
+        + [(name, "tag", count) for name, count in tags if name]
+    )
+    return PrefixIndex(terms)
+
+
+_index: Optional[PrefixIndex] = None
+_built_at = 0.0
+_checked_at = 0.0
+_generations: list[int] = []
+_lock = threading.Lock()
+_rebuilding = False
+
+
+def _current_generations() -> list[int]:
+    try:
+        return get_generations((JOBS, TAGS, COMPANIES))
+    except RedisError as e:
+        current_app.logger.warning(f"Suggest index generation check failed: {e}")
+        return []
+
+
+def _install(index: PrefixIndex, generations: list[int]) -> None:
+    global _index, _built_at, _checked_at, _generations
+    _index = index
+    _generations = generations
+    _built_at = _checked_at = time.monotonic()
+
+
+def _rebuild(app, generations: list[int]) -> None:
+    """Build a fresh index in the background and swap it in when done."""
+    global _rebuilding
+    with app.app_context():
+        try:
+            _install(build_prefix_index(), generations)
+        except Exception:
+            app.logger.exception("Suggest index rebuild failed")
+        finally:
+            db.session.remove()
+            with _lock:
+                _rebuilding = False
+
+
+def get_prefix_index() -> PrefixIndex:
+    """Return this process's index, refreshing it when the data has changed.
+
+    Generations are compared at most every SUGGEST_MIN_REFRESH_SECONDS, so
+    most lookups do no I/O. Only the first build blocks a request; a stale
+    index keeps being served while a background thread builds its
+    replacement.
+    """
+    global _checked_at, _rebuilding
+    if _index is None:
+        with _lock:
+            # another thread may have finished the first build while we waited
+            if _index is None:
+                generations = _current_generations()
+                _install(build_prefix_index(), generations)
+        return _index
+    now = time.monotonic()
+    if now - _checked_at < SUGGEST_MIN_REFRESH_SECONDS:
+        return _index
+    _checked_at = now
+    generations = _current_generations()
+    stale = (
+        not generations
+        or generations != _generations
+        or now - _built_at >= SUGGEST_MAX_AGE_SECONDS
+    )
+    if stale:
+        with _lock:
+            if _rebuilding:
+                return _index
+            _rebuilding = True
+        threading.Thread(
+            target=_rebuild,
+            args=(current_app._get_current_object(), generations),
+            daemon=True,
+        ).start()
+    return _index
@@ -0,0 +1,266 @@
+from datetime import datetime
+from typing import Any, Optional
+import base64
+import json
+import os
+import orjson
+from flask import current_app, jsonify, request
+from sqlalchemy.orm import load_only, selectinload
+from app.config import db
+from app.models import Company, Job, JobAttachment, Status, Tag
+from app.utils.minio_client import presign_get_urls
+
+# `format=compact` returns rows as column arrays, encoded with orjson
+COMPACT_FORMAT = "compact"
+
+
+# Row fields in output order. "score" is only emitted for search results.
+JOB_FIELDS = (
+    "id",
+    "company",
+    "title",
+    "link",
+    "posted_date",
+    "status",
+    "priority",
+    "archived",
+    "atsScore",
+    "notes",
+    "tags",
+    "company_image_url",
+    "score",
+    "resumeFilename",
+    "resumeUrl",
+    "coverLetterFilename",
+    "coverLetterUrl",
+)
+# the fields /api/jobs returns when no projection is requested
+JOB_LIST_FIELDS = frozenset(JOB_FIELDS[:12])
+
+_FIELD_COLUMNS = {
+    "title": Job.title,
+    "link": Job.link,
+    "posted_date": Job.posted_date,
+    "status": Job.status,
+    "priority": Job.priority,
+    "archived": Job.archived,
+    "atsScore": Job.ats_score,
+    "notes": Job.notes,
+}
+_ATTACHMENT_FIELDS = {
+    "resumeFilename": ("resume", False),
+    "resumeUrl": ("resume", True),
+    "coverLetterFilename": ("cover_letter", False),
+    "coverLetterUrl": ("cover_letter", True),
+}
+
+
+def parse_fields(raw: Optional[str]) -> Optional[frozenset]:
+    """Parse a comma-separated `fields` argument; None selects every field.
+
+    `id` is always included. Raises ValueError naming any unknown field.
+    """
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = fields.difference(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(fields | {"id"})
+
+
+def eager_job_options(fields: Optional[frozenset] = None):
+    """Loader options for a page of jobs.
+
+    With no projection, companies and tags are fetched in one query each.
+    Otherwise only the requested columns are selected and relationships the
+    projection does not use are not loaded at all.
+    """
+    if fields is None:
+        return (selectinload(Job.company), selectinload(Job.tags))
+    columns = [
+        _FIELD_COLUMNS[f] for f in JOB_FIELDS if f in fields and f in _FIELD_COLUMNS
+    ]
+    options = [load_only(Job.id, Job.company_id, *columns)]
+    if fields & {"company", "company_image_url"}:
+        options.append(
+            selectinload(Job.company).load_only(Company.name, Company.image_url)
+        )
+    if "tags" in fields:
+        options.append(selectinload(Job.tags).load_only(Tag.name))
+    return tuple(options)
+
+
+def load_jobs(ids: list[int], fields: Optional[frozenset] = None) -> list[Job]:
+    """Load non-deleted jobs by id with relationships batched, preserving id order."""
+    if not ids:
+        return []
+    jobs = (
+        Job.query.options(*eager_job_options(fields))
+        .filter(Job.id.in_(ids), Job.deleted.is_(False))
+        .all()
+    )
+    by_id = {j.id: j for j in jobs}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def load_attachments(job_ids: list[int]) -> dict[int, dict[str, JobAttachment]]:
+    """Fetch attachments for many jobs in a single query, keyed by job and type."""
+    result: dict[int, dict[str, JobAttachment]] = {}
+    if not job_ids:
+        return result
+    atts = (
+        db.session()
+        .query(JobAttachment)
+        .filter(JobAttachment.job_id.in_(job_ids))
+        .order_by(JobAttachment.id)
+        .all()
+    )
+    for att in atts:
+        # keep the first attachment of each type, matching the old .first() lookups
+        result.setdefault(att.job_id, {}).setdefault(att.attachment_type, att)
+    return result
+
+
+_FIELD_GETTERS = {
+    "id": lambda j: j.id,
+    "company": lambda j: j.company.name if j.company else None,
+    "title": lambda j: j.title,
+    "link": lambda j: j.link,
+    "posted_date": lambda j: j.posted_date.isoformat(),
+    "status": lambda j: j.status.value,
+    "priority": lambda j: j.priority,
+    "archived": lambda j: j.archived,
+    "atsScore": lambda j: j.ats_score,
+    "notes": lambda j: j.notes or "",
+    "tags": lambda j: [t.name for t in j.tags],
+    "company_image_url": lambda j: (
+        j.company.image_url if j.company and j.company.image_url else None
+    ),
+}
+
+
+def serialize_jobs(
+    jobs: list[Job],
+    scores: Optional[dict[int, Optional[float]]] = None,
+    fields: Optional[frozenset] = None,
+) -> list[dict]:
+    """Build tracker rows for a page of jobs using a fixed number of queries.
+
+    `fields` limits each row to a projection (see parse_fields); attachments
+    are only queried, and URLs only signed, when the projection asks for them.
+    Attachment URLs are signed in one batch through the shared presigner.
+    """
+    names = [
+        f
+        for f in JOB_FIELDS
+        if (fields is None or f in fields) and (f != "score" or scores is not None)
+    ]
+    getters = [(f, _FIELD_GETTERS[f]) for f in names if f in _FIELD_GETTERS]
+    attachment_fields = [
+        (f, *_ATTACHMENT_FIELDS[f]) for f in names if f in _ATTACHMENT_FIELDS
+    ]
+
+    attachments = (
+        load_attachments([j.id for j in jobs]) if attachment_fields else {}
+    )
+    signed_kinds = {kind for _, kind, is_url in attachment_fields if is_url}
+    urls = {}
+    if signed_kinds:
+        bucket = os.getenv("MINIO_BUCKET", "job-attachments")
+        urls = presign_get_urls(
+            bucket,
+            (
+                att.object_key
+                for atts in attachments.values()
+                for kind, att in atts.items()
+                if kind in signed_kinds
+            ),
+        )
+
+    rows = []
+    for j in jobs:
+        row = {name: get(j) for name, get in getters}
+        if "score" in names:
+            row["score"] = scores.get(j.id)
+        atts = attachments.get(j.id, {})
+        for name, kind, is_url in attachment_fields:
+            att = atts.get(kind)
+            if att is None:
+                row[name] = None
+            else:
+                row[name] = urls.get(att.object_key) if is_url else att.filename
+        rows.append(row)
+    return rows
+
+
+def pack_rows(rows: list[dict]):
+    """Return `rows` as-is, or as {"columns", "rows"} arrays when the request
+    asked for the compact format, which drops the repeated keys."""
+    if request.args.get("format") != COMPACT_FORMAT:
+        return rows
+    columns = list(rows[0]) if rows else []
+    return {"columns": columns, "rows": [list(r.values()) for r in rows]}
+
+
+def json_response(payload: dict):
+    """jsonify `payload`, encoding it with orjson for the compact format."""
+    if request.args.get("format") != COMPACT_FORMAT:
+        return jsonify(payload)
+    return current_app.response_class(
+        orjson.dumps(payload), mimetype="application/json"
+    )
+
+
+def tracker_response(
+    jobs: list[dict], pagination: dict, status_counts: dict, **extra
+) -> dict:
+    """Wrap serialized rows in the envelope the tracker frontend expects."""
+    tracker_data = {
+        "jobs": pack_rows(jobs),
+        "pagination": pagination,
+        "statusCounts": status_counts,
+        "scrapeInfo": {
+            "scraping": False,
+            "scrapeProgress": 0,
+            "estimatedSeconds": 0,
+        },
+        "health": {"isHealthy": True},
+    }
+    tracker_data.update(extra)
+    return {"success": True, "trackerData": tracker_data}
+
+
+def encode_cursor(sort_by: str, direction: str, value: Any, job_id: int) -> str:
+    """Encode the last row's sort key as an opaque, URL-safe cursor."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Status):
+        value = value.value
+    payload = json.dumps({"s": sort_by, "d": direction, "v": value, "id": job_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, direction: str) -> tuple[Any, int]:
+    """Decode a cursor into (sort value, job id); raise ValueError if it is invalid
+    or was issued for a different sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, job_id = payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if payload.get("s") != sort_by or payload.get("d") != direction:
+        raise ValueError("Cursor does not match the requested sort")
+    if value is None and sort_by != "id":
+        # tracker sort keys are NOT NULL; a NULL would make the seek match
+        # nothing (id cursors carry only the id)
+        raise ValueError("Invalid cursor")
+    try:
+        if sort_by == "date":
+            value = datetime.fromisoformat(value)
+        elif sort_by == "status":
+            value = Status(value)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    return value, job_id
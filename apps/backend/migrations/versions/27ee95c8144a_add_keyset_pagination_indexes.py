@@ -0,0 +1,29 @@
+"""Add composite indexes for keyset pagination on jobs
+
+Revision ID: 27ee95c8144a
+Revises: 72e3f83c6a2e
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "27ee95c8144a"
+down_revision = "72e3f83c6a2e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("idx_job_posted_date_id", "jobs", ["posted_date", "id"])
+    op.create_index("idx_job_status_id", "jobs", ["status", "id"])
+    op.create_index("idx_job_title_id", "jobs", ["title", "id"])
+
+
+def downgrade():
+    op.drop_index("idx_job_title_id", table_name="jobs")
+    op.drop_index("idx_job_status_id", table_name="jobs")
+    op.drop_index("idx_job_posted_date_id", table_name="jobs")
@@ -0,0 +1,126 @@
+"""Add job_status_counts table maintained by statement-level triggers
+
+Revision ID: 39c0a2411d16
+Revises: 27ee95c8144a
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "39c0a2411d16"
+down_revision = "27ee95c8144a"
+branch_labels = None
+depends_on = None
+
+
+# Each trigger folds the statement's transition rows into one delta per counter
+# key, so bulk UPDATEs touch each counter row once. Rows are upserted in key
+# order to avoid deadlocks between concurrent writers.
+APPLY_DELTAS = """
+    INSERT INTO job_status_counts AS c (status, archived, priority, deleted, count)
+    SELECT status, archived, priority, deleted, sum(delta)
+    FROM ({rows}) d
+    GROUP BY status, archived, priority, deleted
+    HAVING sum(delta) <> 0
+    ORDER BY status, archived, priority, deleted
+    ON CONFLICT (status, archived, priority, deleted)
+    DO UPDATE SET count = c.count + EXCLUDED.count;
+"""
+
+ROW_KEYS = """
+    SELECT status, archived, priority, deleted, {sign} AS delta
+    FROM {table}
+"""
+
+# the counter keys are NOT NULL on jobs too, so counters and filters such as
+# `deleted IS false` classify every row the same way
+FLAGS = ("archived", "priority", "deleted")
+
+NEW_ROWS = ROW_KEYS.format(sign=1, table="new_rows")
+OLD_ROWS = ROW_KEYS.format(sign=-1, table="old_rows")
+
+TRIGGERS = {
+    "INSERT": ("REFERENCING NEW TABLE AS new_rows", NEW_ROWS),
+    "UPDATE": (
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+        f"{NEW_ROWS} UNION ALL {OLD_ROWS}",
+    ),
+    "DELETE": ("REFERENCING OLD TABLE AS old_rows", OLD_ROWS),
+}
+
+
+def upgrade():
+    for flag in FLAGS:
+        op.execute(f"UPDATE jobs SET {flag} = false WHERE {flag} IS NULL")
+        op.alter_column(
+            "jobs",
+            flag,
+            existing_type=sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        )
+
+    op.create_table(
+        "job_status_counts",
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="status", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("archived", sa.Boolean(), nullable=False),
+        sa.Column("priority", sa.Boolean(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("status", "archived", "priority", "deleted"),
+    )
+
+    for event, (referencing, rows) in TRIGGERS.items():
+        name = f"job_status_counts_{event.lower()}"
+        op.execute(
+            f"""
+            CREATE FUNCTION {name}() RETURNS trigger AS $$
+            BEGIN
+                {APPLY_DELTAS.format(rows=rows)}
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{name} AFTER {event} ON jobs
+            {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION {name}();
+            """
+        )
+
+    # backfill from the current table contents
+    op.execute(
+        """
+        INSERT INTO job_status_counts (status, archived, priority, deleted, count)
+        SELECT status, archived, priority, deleted, count(*)
+        FROM jobs
+        GROUP BY 1, 2, 3, 4;
+        """
+    )
+
+
+def downgrade():
+    for event in TRIGGERS:
+        name = f"job_status_counts_{event.lower()}"
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{name} ON jobs;")
+        op.execute(f"DROP FUNCTION IF EXISTS {name}();")
+    op.drop_table("job_status_counts")
+    for flag in FLAGS:
+        op.alter_column(
+            "jobs",
+            flag,
+            existing_type=sa.Boolean(),
+            nullable=True,
+            server_default=None,
+        )
@@ -0,0 +1,41 @@
+"""Add job_link_checks for incremental dead-link sweeps
+
+Revision ID: 5b7d0e93a1c4
+Revises: e22f0fcb86c3
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b7d0e93a1c4"
+down_revision = "e22f0fcb86c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_link_checks",
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("checked_at", sa.DateTime(), nullable=False),
+        sa.Column("http_status", sa.Integer(), nullable=True),
+        sa.Column("etag", sa.String(), nullable=True),
+        sa.Column("last_modified", sa.String(), nullable=True),
+        sa.Column(
+            "consecutive_failures", sa.Integer(), nullable=False, server_default="0"
+        ),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    op.create_index(
+        "idx_link_check_checked_at", "job_link_checks", ["checked_at"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("idx_link_check_checked_at", table_name="job_link_checks")
+    op.drop_table("job_link_checks")
@@ -0,0 +1,158 @@
+"""Add tsvector and trigram indexes for the Postgres search backend
+
+Revision ID: 8856c5a64025
+Revises: 39c0a2411d16
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "8856c5a64025"
+down_revision = "39c0a2411d16"
+branch_labels = None
+depends_on = None
+
+
+# Weighted document: title (A), company (B), tags (C), notes (D). The 'simple'
+# configuration keeps company names and tags unstemmed so prefix queries match.
+DOCUMENT_FUNCTION = """
+CREATE FUNCTION job_search_document(
+    p_job_id integer, p_title text, p_company_id integer, p_notes text
+) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(p_title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(
+            (SELECT name FROM companies WHERE id = p_company_id), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(
+            (SELECT string_agg(t.name, ' ')
+             FROM job_tags jt JOIN tags t ON t.id = jt.tag_id
+             WHERE jt.job_id = p_job_id), '')), 'C')
+        || setweight(to_tsvector('simple', coalesce(p_notes, '')), 'D')
+$$ LANGUAGE sql STABLE;
+"""
+
+REFRESH_JOBS = """
+    UPDATE jobs
+    SET search_vector = job_search_document(
+        jobs.id, jobs.title, jobs.company_id, jobs.notes
+    )
+"""
+
+TRIGGER_FUNCTIONS = {
+    # the job row's own columns changed: recompute before the write
+    "jobs_search_vector_row": """
+        BEGIN
+            NEW.search_vector := job_search_document(
+                NEW.id, NEW.title, NEW.company_id, NEW.notes
+            );
+            RETURN NEW;
+        END;
+    """,
+    "job_tags_search_vector_insert": f"""
+        BEGIN
+            {REFRESH_JOBS} WHERE jobs.id IN (SELECT job_id FROM new_rows);
+            RETURN NULL;
+        END;
+    """,
+    "job_tags_search_vector_delete": f"""
+        BEGIN
+            {REFRESH_JOBS} WHERE jobs.id IN (SELECT job_id FROM old_rows);
+            RETURN NULL;
+        END;
+    """,
+    "tags_search_vector_update": f"""
+        BEGIN
+            {REFRESH_JOBS} WHERE jobs.id IN (
+                SELECT job_id FROM job_tags WHERE tag_id = NEW.id
+            );
+            RETURN NULL;
+        END;
+    """,
+    "companies_search_vector_update": f"""
+        BEGIN
+            {REFRESH_JOBS} WHERE jobs.company_id = NEW.id;
+            RETURN NULL;
+        END;
+    """,
+}
+
+TRIGGERS = [
+    (
+        "jobs_search_vector_row",
+        "BEFORE INSERT OR UPDATE OF title, notes, company_id ON jobs FOR EACH ROW",
+    ),
+    (
+        "job_tags_search_vector_insert",
+        "AFTER INSERT ON job_tags REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT",
+    ),
+    (
+        "job_tags_search_vector_delete",
+        "AFTER DELETE ON job_tags REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT",
+    ),
+    # only renames change the document; other column updates (follower
+    # counts, logos, blacklisting) must not rewrite every job of the company.
+    # Column lists and WHEN (OLD/NEW) both require row-level triggers.
+    (
+        "tags_search_vector_update",
+        "AFTER UPDATE OF name ON tags FOR EACH ROW "
+        "WHEN (OLD.name IS DISTINCT FROM NEW.name)",
+    ),
+    (
+        "companies_search_vector_update",
+        "AFTER UPDATE OF name ON companies FOR EACH ROW "
+        "WHEN (OLD.name IS DISTINCT FROM NEW.name)",
+    ),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.add_column("jobs", sa.Column("search_vector", postgresql.TSVECTOR()))
+    op.execute(DOCUMENT_FUNCTION)
+    for name, body in TRIGGER_FUNCTIONS.items():
+        op.execute(
+            f"CREATE FUNCTION {name}() RETURNS trigger AS $$ {body} $$ "
+            "LANGUAGE plpgsql;"
+        )
+    for name, definition in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER trg_{name} {definition} EXECUTE FUNCTION {name}();"
+        )
+
+    op.execute(REFRESH_JOBS + ";")
+    op.create_index(
+        "idx_job_search_vector",
+        "jobs",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    # trigram indexes serve fuzzy matching and the substring (LIKE '%x%') search
+    op.execute(
+        "CREATE INDEX idx_job_title_trgm ON jobs "
+        "USING gin (lower(title) gin_trgm_ops);"
+    )
+    op.execute(
+        "CREATE INDEX idx_company_name_trgm ON companies "
+        "USING gin (lower(name) gin_trgm_ops);"
+    )
+
+
+def downgrade():
+    op.drop_index("idx_company_name_trgm", table_name="companies")
+    op.drop_index("idx_job_title_trgm", table_name="jobs")
+    op.drop_index("idx_job_search_vector", table_name="jobs")
+    for name, definition in TRIGGERS:
+        table = definition.split(" ON ")[1].split()[0]
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{name} ON {table};")
+    for name in TRIGGER_FUNCTIONS:
+        op.execute(f"DROP FUNCTION IF EXISTS {name}();")
+    op.execute(
+        "DROP FUNCTION IF EXISTS job_search_document(integer, text, integer, text);"
+    )
+    op.drop_column("jobs", "search_vector")
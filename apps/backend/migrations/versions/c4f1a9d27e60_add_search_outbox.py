@@ -0,0 +1,66 @@
+"""Add search_outbox filled by triggers on jobs
+
+Revision ID: c4f1a9d27e60
+Revises: 5b7d0e93a1c4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c4f1a9d27e60"
+down_revision = "5b7d0e93a1c4"
+branch_labels = None
+depends_on = None
+
+
+# One outbox row per touched job per statement. Tag and company changes reach
+# jobs through the search_vector triggers, which UPDATE the affected jobs.
+TRIGGERS = {
+    "INSERT": ("REFERENCING NEW TABLE AS new_rows", "SELECT id FROM new_rows"),
+    "UPDATE": ("REFERENCING NEW TABLE AS new_rows", "SELECT id FROM new_rows"),
+    "DELETE": ("REFERENCING OLD TABLE AS old_rows", "SELECT id FROM old_rows"),
+}
+
+
+def upgrade():
+    op.create_table(
+        "search_outbox",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    for event, (referencing, rows) in TRIGGERS.items():
+        name = f"search_outbox_{event.lower()}"
+        op.execute(
+            f"""
+            CREATE FUNCTION {name}() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO search_outbox (job_id) {rows};
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{name} AFTER {event} ON jobs
+            {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION {name}();
+            """
+        )
+
+
+def downgrade():
+    for event in TRIGGERS:
+        name = f"search_outbox_{event.lower()}"
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{name} ON jobs;")
+        op.execute(f"DROP FUNCTION IF EXISTS {name}();")
+    op.drop_table("search_outbox")
@@ -0,0 +1,43 @@
+"""Backfill NULL job posted dates and make the column NOT NULL
+
+Revision ID: d7e2b5a1f3c8
+Revises: c4f1a9d27e60
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d7e2b5a1f3c8"
+down_revision = "c4f1a9d27e60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keyset cursors compare (posted_date, id) rows, which a NULL date would
+    # make unknown for every row and end paging early
+    op.execute(
+        "UPDATE jobs SET posted_date = COALESCE(created_at, now()) "
+        "WHERE posted_date IS NULL"
+    )
+    op.alter_column(
+        "jobs",
+        "posted_date",
+        existing_type=sa.DateTime(),
+        existing_server_default=sa.text("now()"),
+        nullable=False,
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "jobs",
+        "posted_date",
+        existing_type=sa.DateTime(),
+        existing_server_default=sa.text("now()"),
+        nullable=True,
+    )
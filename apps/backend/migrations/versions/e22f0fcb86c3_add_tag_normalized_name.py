@@ -0,0 +1,54 @@
+"""Add unique normalized_name to tags and merge case/whitespace duplicates
+
+Revision ID: e22f0fcb86c3
+Revises: 8856c5a64025
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e22f0fcb86c3"
+down_revision = "8856c5a64025"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("tags", sa.Column("normalized_name", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE tags SET normalized_name = "
+        "lower(regexp_replace(coalesce(name, ''), '\\s', '', 'g'));"
+    )
+    # point jobs at the oldest tag of each duplicate group, then drop the rest
+    op.execute(
+        """
+        CREATE TEMP TABLE tag_merges ON COMMIT DROP AS
+        SELECT t.id AS duplicate_id, keep.id AS canonical_id
+        FROM tags t
+        JOIN LATERAL (
+            SELECT min(id) AS id FROM tags WHERE normalized_name = t.normalized_name
+        ) keep ON keep.id <> t.id;
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO job_tags (job_id, tag_id)
+        SELECT jt.job_id, m.canonical_id
+        FROM job_tags jt JOIN tag_merges m ON m.duplicate_id = jt.tag_id
+        ON CONFLICT DO NOTHING;
+        """
+    )
+    op.execute("DELETE FROM tags WHERE id IN (SELECT duplicate_id FROM tag_merges);")
+    op.alter_column("tags", "normalized_name", nullable=False)
+    op.create_index(
+        "uq_tag_normalized_name", "tags", ["normalized_name"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_tag_normalized_name", table_name="tags")
+    op.drop_column("tags", "normalized_name")
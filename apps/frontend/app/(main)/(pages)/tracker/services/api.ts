@@ -67,8 +67,15 @@ async function getJobs(): Promise<Job[]> {
     follower_count?: number;
     company_image_url?: string | null;
   }
-  const d = await req<{ jobs: Raw[] }>(`${BASE_URL}/api/jobs`);
-  return d.jobs.map((j) => ({
+  const raw: Raw[] = [];
+  let cursor: string | null = null;
+  do {
+    const qs: string = cursor ? `?limit=1000&cursor=${encodeURIComponent(cursor)}` : "?limit=1000";
+    const d: { jobs: Raw[]; nextCursor: string | null } = await req(`${BASE_URL}/api/jobs${qs}`);
+    raw.push(...d.jobs);
+    cursor = d.nextCursor;
+  } while (cursor);
+  return raw.map((j) => ({
     id: j.id,
     company: j.company,
     title: j.title,
@@ -188,10 +195,18 @@ export async function deleteOlderThan(m: number) {
 }
 
 export async function removeDeadLinks() {
-  return req<{ removed_count: number }>(`${BASE_URL}/api/jobs/remove-dead-links`, {
+  await req<{ started: boolean }>(`${BASE_URL}/api/jobs/remove-dead-links`, {
     method: "POST",
     headers: HEADERS,
   });
+  for (;;) {
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+    const st = await req<{ running: boolean; removed: number; error: string | null }>(
+      `${BASE_URL}/api/jobs/remove-dead-links/status`,
+    );
+    if (st.error) throw new Error(st.error);
+    if (!st.running) return { removed_count: st.removed };
+  }
 }
 
 export async function archiveRejected() {